@@ -4,30 +4,76 @@
 import addonHandler
 import globalPluginHandler
 import scriptHandler
+import api
 import config
 import gui
+from logHandler import log
+import ui
 
-from .settingsDialogs import OptionsPanel
-from .voiceToggle import VoiceToggle
+import time
+import wx
+
+import globalPlugins.voiceToggle.consts as consts
 
 addonHandler.initTranslation()
 
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 
 	def __init__(self):
+		startTime = time.perf_counter()
 		super(GlobalPlugin, self).__init__()
 
-		gui.settingsDialogs.NVDASettingsDialog.categoryClasses.append(OptionsPanel)
-		self.app = VoiceToggle()
-		config.post_configProfileSwitch.register(self.app.handleProfileSwitch)
+		# Only the configuration spec is registered during NVDA startup, the rest of the add-on is initialized once NVDA has started, or on first use
+		config.conf.spec["VoiceToggle"] = consts.CONFIG_SPEC
+		self._app = None
+		self.optionsPanelClass = None
+		self.isTerminated = False
+		config.post_configProfileSwitch.register(self.handleProfileSwitch)
+		config.pre_configSave.register(self.handlePreConfigSave)
+		config.post_configSave.register(self.handlePostConfigSave)
+		wx.CallAfter(self.getApp)
+		self.startupTime = time.perf_counter() - startTime
+
+	def getApp(self):
+		if self._app == None and not self.isTerminated:
+			startTime = time.perf_counter()
+			from .settingsDialogs import OptionsPanel
+			from .voiceToggle import VoiceToggle
+			self._app = VoiceToggle()
+			self.optionsPanelClass = OptionsPanel
+			gui.settingsDialogs.NVDASettingsDialog.categoryClasses.append(OptionsPanel)
+			initTime = time.perf_counter() - startTime
+			self._app.perfTrace.setStartupTime("globalPlugin", self.startupTime)
+			self._app.perfTrace.setStartupTime("deferredInitialization", initTime)
+			log.debug(f"VoiceToggle: Started in {self.startupTime * 1000:.1f} ms, deferred initialization took {initTime * 1000:.1f} ms")
+		return self._app
+
+	app = property(getApp)
+
+	def handleProfileSwitch(self):
+		self.app.handleProfileSwitch()
+
+	def handlePreConfigSave(self):
+		if self._app != None:
+			self._app.handlePreConfigSave()
+
+	def handlePostConfigSave(self):
+		if self._app != None:
+			self._app.handlePostConfigSave()
 
 	def terminate(self):
-		self.app.terminate()
+		self.isTerminated = True
+		if self._app != None:
+			self._app.terminate()
 
 	def __terminate__(self):
 		self.terminate()
 		super(GlobalPlugin, self).__terminate__()
-		gui.settingsDialogs.NVDASettingsDialog.categoryClasses.remove(OptionsPanel)
+		config.post_configProfileSwitch.unregister(self.handleProfileSwitch)
+		config.pre_configSave.unregister(self.handlePreConfigSave)
+		config.post_configSave.unregister(self.handlePostConfigSave)
+		if self.optionsPanelClass != None:
+			gui.settingsDialogs.NVDASettingsDialog.categoryClasses.remove(self.optionsPanelClass)
 
 	@scriptHandler.script(
 		gesture="kb:NVDA+Alt+V",
@@ -36,3 +82,25 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	)
 	def script_toggleVoice(self, gesture):
 		self.app.toggleVoice()
+
+	@scriptHandler.script(
+		# Translators: Gesture description for the Input gestures settings dialog
+		description=_("Reports the timings of recent voice toggles and profile switches. Pressed twice, copies them to the clipboard and writes them to the NVDA log."),
+	)
+	def script_reportPerfTrace(self, gesture):
+		summary = self.app.getPerfTraceSummary()
+		if summary == None:
+			# Translators: Message reported when reporting the timings is requested but timings recording is disabled
+			ui.message(_("Recording of VoiceToggle timings is disabled"))
+			return
+		if summary == "":
+			# Translators: Message reported when reporting the timings is requested but nothing has been recorded yet
+			ui.message(_("No VoiceToggle timings recorded yet"))
+			return
+		if scriptHandler.getLastScriptRepeatCount() == 0:
+			ui.message(summary)
+		else:
+			self.app.dumpPerfTrace()
+			api.copyToClip(summary)
+			# Translators: Message reported when the timings have been copied to the clipboard
+			ui.message(_("VoiceToggle timings copied to clipboard"))
@@ -0,0 +1,144 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+import globalVars
+from logHandler import log
+
+import json
+import os
+import threading
+
+addonHandler.initTranslation()
+
+JOURNAL_FILE_NAME = "voiceToggleJournal.jsonl"
+
+# Number of records after which the journal is rewritten to contain only the latest record of each kind
+JOURNAL_COMPACTION_SIZE = 500
+
+def getRecordKey(record):
+	# Records with the same key replace each other, a record of all voice settings replaces all records
+	op = record[0]
+	if op == "param":
+		return (op, record[1], record[2])
+	if op in ("voice", "profileVoice"):
+		return (op, record[1])
+	return (op,)
+
+class ChangeJournal:
+	"""Append-only file of the changes of the VoiceToggle settings which NVDA has not saved yet, so that the changes can be restored after a crash."""
+
+	def __init__(self, path=None):
+		self.path = path if path != None else os.path.join(globalVars.appArgs.configPath, JOURNAL_FILE_NAME)
+		self.lock = threading.Lock()
+		self.file = None
+		self.isEnabled = True
+		self.latestRecords = {}
+		self.recordsCount = 0
+		self.recordsSinceSnapshot = None
+		self.compactionThread = None
+
+	def load(self):
+		"""Returns the records of the journal in the order in which they were appended."""
+		records = []
+		try:
+			with open(self.path, "r", encoding="utf-8") as file:
+				for line in file:
+					try:
+						records.append((json.loads(line), line if line.endswith("\n") else line + "\n"))
+					except ValueError:
+						# The last line may be incomplete if NVDA crashed while writing it
+						log.debugWarning(f"VoiceToggle: Skipping invalid journal record {line!r}")
+		except FileNotFoundError:
+			pass
+		except OSError:
+			log.warning("VoiceToggle: Unable to read the change journal", exc_info=True)
+		with self.lock:
+			self.recordsCount = len(records)
+			for record, line in records:
+				self.rememberRecord(record, line)
+		return [record for record, line in records]
+
+	def rememberRecord(self, record, line):
+		# The latest records are kept serialized, so that compaction does not read the settings while they change
+		key = getRecordKey(record)
+		if key == ("settings",):
+			self.latestRecords.clear()
+		else:
+			# Moving the record to the end keeps the records in the order of their last change
+			self.latestRecords.pop(key, None)
+		self.latestRecords[key] = line
+
+	def append(self, record):
+		if not self.isEnabled:
+			return
+		line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+		with self.lock:
+			try:
+				if self.file == None:
+					self.file = open(self.path, "a", encoding="utf-8")
+				self.file.write(line)
+				# Flushing is enough to survive a crash of NVDA, and much cheaper than syncing to the disk
+				self.file.flush()
+			except OSError:
+				log.warning("VoiceToggle: Unable to write the change journal, disabling it", exc_info=True)
+				self.isEnabled = False
+				return
+			self.rememberRecord(record, line)
+			self.recordsCount += 1
+			if self.recordsSinceSnapshot != None:
+				self.recordsSinceSnapshot.append(line)
+			# Compaction is not repeated until the journal has grown to twice its compacted size
+			isCompactionNeeded = self.recordsCount >= max(JOURNAL_COMPACTION_SIZE, 2 * len(self.latestRecords)) and self.compactionThread == None
+			if isCompactionNeeded:
+				self.recordsSinceSnapshot = []
+				lines = list(self.latestRecords.values())
+				self.compactionThread = threading.Thread(target=self.compact, args=(lines,), name="VoiceToggle journal compaction", daemon=True)
+		if isCompactionNeeded:
+			self.compactionThread.start()
+
+	def compact(self, lines):
+		# The records are written to a new file in the background, and only the records appended meanwhile are copied under the lock
+		tempPath = self.path + ".tmp"
+		try:
+			with open(tempPath, "w", encoding="utf-8") as file:
+				file.writelines(lines)
+				with self.lock:
+					file.writelines(self.recordsSinceSnapshot)
+					if self.file != None:
+						self.file.close()
+						self.file = None
+					file.close()
+					os.replace(tempPath, self.path)
+					self.recordsCount = len(lines) + len(self.recordsSinceSnapshot)
+		except OSError:
+			log.warning("VoiceToggle: Unable to compact the change journal", exc_info=True)
+		finally:
+			with self.lock:
+				self.recordsSinceSnapshot = None
+				self.compactionThread = None
+
+	def clear(self):
+		"""Deletes the journal once all its changes have been saved by NVDA."""
+		self.waitForCompaction()
+		with self.lock:
+			if self.file != None:
+				self.file.close()
+				self.file = None
+			self.latestRecords.clear()
+			self.recordsCount = 0
+			try:
+				os.remove(self.path)
+			except FileNotFoundError:
+				pass
+			except OSError:
+				log.warning("VoiceToggle: Unable to delete the change journal", exc_info=True)
+
+	def waitForCompaction(self):
+		compactionThread = self.compactionThread
+		if compactionThread != None:
+			compactionThread.join()
+
+	def terminate(self):
+		# On a regular exit, saving the changes is left to NVDA, exactly like when the journal did not exist
+		self.clear()
@@ -0,0 +1,175 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+from logHandler import log
+
+import json
+
+import globalPlugins.voiceToggle.consts as consts
+
+addonHandler.initTranslation()
+
+FIELD_SEPARATOR = "\t"
+
+def encodeVoiceSetting(voiceSetting, synthIndex):
+	# The voice ID is the last field, so that it may contain any characters
+	params = [str(voiceSetting[param]) if param in voiceSetting else "" for param in consts.SAVED_PARAMS]
+	return FIELD_SEPARATOR.join([str(voiceSetting["id"]), str(synthIndex)] + params + [voiceSetting["voiceId"]])
+
+def decodeVoiceSetting(record, synthsIds):
+	fields = record.split(FIELD_SEPARATOR, len(consts.SAVED_PARAMS) + 2)
+	if len(fields) != len(consts.SAVED_PARAMS) + 3:
+		raise ValueError(f"Invalid voice setting record: {record!r}")
+	voiceSetting = {
+		"id": int(fields[0]),
+		"synthId": synthsIds[int(fields[1])],
+		"voiceId": fields[-1],
+	}
+	for param, value in zip(consts.SAVED_PARAMS, fields[2:-1]):
+		if value != "":
+			voiceSetting[param] = int(value)
+	return voiceSetting
+
+def encodeProfileVoiceSetting(profileName, voiceSettingId):
+	# The profile name is the last field, so that it may contain any characters
+	return f"{'' if voiceSettingId == None else voiceSettingId}{FIELD_SEPARATOR}{profileName}"
+
+def decodeProfileVoiceSetting(record):
+	voiceSettingId, profileName = record.split(FIELD_SEPARATOR, 1)
+	return profileName, None if voiceSettingId == "" else int(voiceSettingId)
+
+def getVoiceSettingsIdsByIndices(voiceSettings, profilesVoiceSettingsIndices):
+	# The released configuration referenced the voice settings by their positions, which become their IDs
+	profilesVoiceSettingsIds = {}
+	for profileName, index in profilesVoiceSettingsIndices.items():
+		if 0 <= index < len(voiceSettings):
+			profilesVoiceSettingsIds[profileName] = index
+		else:
+			profilesVoiceSettingsIds[profileName] = 0 if len(voiceSettings) > 0 else None
+	return profilesVoiceSettingsIds
+
+class ConfigStore:
+	"""Stores the voice settings in the add-on configuration as compact records referencing a table of synth IDs, and writes only the records and keys which have changed since the last save."""
+
+	def __init__(self, getConfig, setConfig):
+		self.getConfig = getConfig
+		self.setConfig = setConfig
+		self.synthsIds = []
+		self.synthsIndices = {}
+		self.voiceSettingsRecords = []
+		self.changedIndices = set()
+		self.isVoiceSettingsListChanged = False
+		self.savedValues = {}
+
+	def load(self):
+		"""Returns the voice settings and the IDs of the voice settings of the profiles, migrating them from an older configuration version first if necessary."""
+		if self.getConfig("configVersion") < consts.CONFIG_VERSION:
+			return self.migrate()
+		return self.loadRecords()
+
+	def loadRecords(self):
+		self.synthsIds = list(self.getConfig("synths"))
+		self.synthsIndices = {synthId: index for index, synthId in enumerate(self.synthsIds)}
+		self.voiceSettingsRecords = []
+		self.isVoiceSettingsListChanged = False
+		voiceSettings = []
+		for record in self.getConfig("voices"):
+			try:
+				voiceSettings.append(decodeVoiceSetting(record, self.synthsIds))
+			except (ValueError, IndexError):
+				log.warning(f"VoiceToggle: Skipping invalid voice setting record {record!r}")
+				self.isVoiceSettingsListChanged = True
+				continue
+			self.voiceSettingsRecords.append(record)
+		profilesVoiceSettingsIds = {}
+		for record in self.getConfig("profiles"):
+			try:
+				profileName, voiceSettingId = decodeProfileVoiceSetting(record)
+			except ValueError:
+				log.warning(f"VoiceToggle: Skipping invalid profile record {record!r}")
+				continue
+			profilesVoiceSettingsIds[profileName] = voiceSettingId
+		self.savedValues = {
+			"synths": list(self.synthsIds),
+			"profiles": list(self.getConfig("profiles")),
+		}
+		self.changedIndices.clear()
+		return voiceSettings, profilesVoiceSettingsIds
+
+	def migrate(self):
+		configVersion = self.getConfig("configVersion")
+
+		# The released configuration stored each voice setting and the profiles indices as JSON strings
+		voiceSettings = []
+		for voiceSettingJson in self.getConfig("voiceSettings"):
+			try:
+				voiceSettings.append(json.loads(voiceSettingJson))
+			except ValueError:
+				log.warning(f"VoiceToggle: Skipping invalid voice setting {voiceSettingJson!r} while migrating the configuration")
+		for index, voiceSetting in enumerate(voiceSettings):
+			voiceSetting["id"] = index
+		try:
+			profilesVoiceSettingsIndices = json.loads(self.getConfig("profilesVoiceSettingsIndices"))
+		except ValueError:
+			profilesVoiceSettingsIndices = {}
+		profilesVoiceSettingsIds = getVoiceSettingsIdsByIndices(voiceSettings, profilesVoiceSettingsIndices)
+		log.info(f"VoiceToggle: Migrating {len(voiceSettings)} voice settings from configuration version {configVersion} to {consts.CONFIG_VERSION}")
+		self.savedValues = {}
+		self.markVoiceSettingsListChanged()
+		self.save(voiceSettings, profilesVoiceSettingsIds)
+		self.setConfig("voiceSettings", [])
+		self.setConfig("profilesVoiceSettingsIndices", "{}")
+		self.setConfig("configVersion", consts.CONFIG_VERSION)
+		return voiceSettings, profilesVoiceSettingsIds
+
+	def loadValue(self, key):
+		value = self.getConfig(key)
+		self.savedValues[key] = value
+		return value
+
+	def markVoiceSettingChanged(self, index):
+		self.changedIndices.add(index)
+
+	def markVoiceSettingsListChanged(self):
+		self.isVoiceSettingsListChanged = True
+
+	def getSynthIndex(self, synthId):
+		index = self.synthsIndices.get(synthId)
+		if index == None:
+			index = len(self.synthsIds)
+			self.synthsIds.append(synthId)
+			self.synthsIndices[synthId] = index
+		return index
+
+	def save(self, voiceSettings, profilesVoiceSettingsIds):
+		if self.isVoiceSettingsListChanged:
+			# The synths table is rebuilt as well, so that the synths no longer used are dropped from it
+			self.synthsIds = []
+			self.synthsIndices = {}
+			self.voiceSettingsRecords = [encodeVoiceSetting(voiceSetting, self.getSynthIndex(voiceSetting["synthId"])) for voiceSetting in voiceSettings]
+			isVoicesChanged = True
+		else:
+			isVoicesChanged = False
+			for index in self.changedIndices:
+				if index >= len(voiceSettings):
+					continue
+				voiceSetting = voiceSettings[index]
+				record = encodeVoiceSetting(voiceSetting, self.getSynthIndex(voiceSetting["synthId"]))
+				if record != self.voiceSettingsRecords[index]:
+					self.voiceSettingsRecords[index] = record
+					isVoicesChanged = True
+		self.isVoiceSettingsListChanged = False
+		self.changedIndices.clear()
+
+		# The synths table must be written before the voices which reference it
+		self.saveValue("synths", list(self.synthsIds))
+		if isVoicesChanged:
+			self.setConfig("voices", list(self.voiceSettingsRecords))
+		self.saveValue("profiles", [encodeProfileVoiceSetting(profileName, voiceSettingId) for profileName, voiceSettingId in profilesVoiceSettingsIds.items()])
+
+	def saveValue(self, key, value):
+		if self.savedValues.get(key) == value:
+			return
+		self.setConfig(key, value)
+		self.savedValues[key] = value
@@ -10,9 +10,48 @@ addonHandler.initTranslation()
 SILENCE_VOICE_NAME = _("Silence")
 
 NORMAL_PROFILE_NAME = "[normal]"
+
+# Version of the format in which the voice settings are stored in the configuration
+CONFIG_VERSION = 3
 CONFIG_SPEC = {
+	"configVersion": "integer(default=0, min=0)",
+	"synths": "string_list(default=list())",
+	"voices": "string_list(default=list())",
+	"profiles": "string_list(default=list())",
+	# Voice settings of configuration version 1, only read when migrating
 	"voiceSettings": "string_list(default=list())",
 	"profilesVoiceSettingsIndices": "string(default='{}')",
 	"enableVoiceUpdateWhenNVDAsettingsChange": "boolean(default=True)",
+	"enableSynthPool": "boolean(default=False)",
+	"synthPoolSize": "integer(default=2, min=1, max=10)",
+	"synthPoolMaxMemory": "integer(default=300, min=0)",
+	"enablePerfTrace": "boolean(default=False)",
+	"enableRapidCycle": "boolean(default=False)",
+	"rapidCycleDelay": "integer(default=500, min=100, max=5000)",
+	"enableAsyncSynthSwitch": "boolean(default=False)",
+	"enableIsolatedVoiceProbe": "boolean(default=False)",
 }
+OTHER_SETTINGS = ["enableVoiceUpdateWhenNVDAsettingsChange", "enableSynthPool", "synthPoolSize", "synthPoolMaxMemory", "enablePerfTrace", "enableRapidCycle", "rapidCycleDelay", "enableAsyncSynthSwitch", "enableIsolatedVoiceProbe"]
 SAVED_PARAMS = ["volume", "rate", "pitch"]
+TRACKED_PARAMS = frozenset(SAVED_PARAMS)
+
+# Maximum number of synths whose voices are probed in parallel in the background
+VOICE_PROBE_MAX_WORKERS = 3
+
+# Synth drivers which may be loaded in the background, as they use no COM objects tied to the thread which created them
+BACKGROUND_LOADABLE_SYNTHS = frozenset(["espeak", "oneCore"])
+
+# Time in seconds after which the process reading the voices of a synth is killed
+VOICE_PROBE_TIMEOUT = 10
+
+# Number of the most recent voice changes and profile switches whose timings are kept
+PERF_TRACE_SIZE = 200
+
+# Delay in milliseconds after the last change before the deferred settings are saved
+SETTINGS_FLUSH_DELAY = 2000
+
+# Delay in milliseconds after a profile switch during which further profile switches are coalesced
+PROFILE_SWITCH_COALESCE_DELAY = 150
+
+# Time in seconds after the last synth or voice change in NVDA settings during which a profile switch reverts that change
+VOICE_SETTINGS_REVERT_WINDOW = 0.2
@@ -0,0 +1,164 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+from logHandler import log
+
+from collections import deque
+import contextlib
+import threading
+import time
+
+addonHandler.initTranslation()
+
+# Shared context manager returned when tracing is disabled, so that disabled tracing costs only a method call
+NULL_CONTEXT = contextlib.nullcontext()
+
+def getPercentile(sortedValues, percent):
+	# Nearest rank percentile of already sorted values
+	if len(sortedValues) == 0:
+		return 0
+	rank = max(1, round(percent / 100 * len(sortedValues)))
+	return sortedValues[min(rank, len(sortedValues)) - 1]
+
+class Phase:
+
+	def __init__(self, trace, name):
+		self.trace = trace
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *args):
+		self.trace.addPhaseTime(self.name, time.perf_counter() - self.start)
+		return False
+
+class Operation:
+
+	def __init__(self, trace, name):
+		self.trace = trace
+		self.name = name
+
+	def __enter__(self):
+		self.trace.startOperation(self.name)
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *args):
+		self.trace.finishOperation(time.perf_counter() - self.start)
+		return False
+
+class PerfTrace:
+	"""Records the timings of the phases of voice changes and profile switches into a fixed size ring buffer."""
+
+	def __init__(self, size):
+		self.isEnabled = False
+		self.records = deque(maxlen=size)
+		self.counters = {}
+		self.startupTimes = {}
+		self.currentRecord = None
+		self.depth = 0
+		self.lock = threading.Lock()
+
+	def enable(self, isEnabled):
+		self.isEnabled = isEnabled
+
+	def operation(self, name):
+		"""Traces a voice change or profile switch, where nested operations are recorded as part of the outermost one."""
+		if not self.isEnabled:
+			return NULL_CONTEXT
+		return Operation(self, name)
+
+	def startOperation(self, name):
+		if self.depth == 0:
+			self.currentRecord = {
+				"operation": name,
+				"phases": {},
+			}
+		self.depth += 1
+
+	def finishOperation(self, duration):
+		self.depth -= 1
+		if self.depth == 0 and self.currentRecord != None:
+			self.currentRecord["phases"]["total"] = duration
+			with self.lock:
+				self.records.append(self.currentRecord)
+			self.currentRecord = None
+
+	def phase(self, name):
+		if not self.isEnabled or self.currentRecord == None:
+			return NULL_CONTEXT
+		return Phase(self, name)
+
+	def addPhaseTime(self, name, duration):
+		record = self.currentRecord
+		if record == None:
+			return
+		record["phases"][name] = record["phases"].get(name, 0) + duration
+
+	def count(self, counter, amount=1):
+		if not self.isEnabled:
+			return
+		with self.lock:
+			self.counters[counter] = self.counters.get(counter, 0) + amount
+
+	def setStartupTime(self, name, duration):
+		# Startup times are kept even when tracing is disabled, as they are measured only once
+		self.startupTimes[name] = duration
+
+	def clear(self):
+		with self.lock:
+			self.records.clear()
+			self.counters = {}
+
+	def getPhasesStats(self):
+		"""Returns the count, median, 95th percentile and maximum in milliseconds for each operation and phase."""
+		with self.lock:
+			records = list(self.records)
+		durations = {}
+		for record in records:
+			operationDurations = durations.setdefault(record["operation"], {})
+			for phase, duration in record["phases"].items():
+				operationDurations.setdefault(phase, []).append(duration * 1000)
+		stats = {}
+		for operation, operationDurations in durations.items():
+			stats[operation] = {}
+			for phase, values in operationDurations.items():
+				values.sort()
+				stats[operation][phase] = {
+					"count": len(values),
+					"p50": getPercentile(values, 50),
+					"p95": getPercentile(values, 95),
+					"max": values[-1],
+				}
+		return stats
+
+	def getSummary(self, extraLines=()):
+		"""Returns the report of the recorded timings and counters, followed by the given extra lines, or an empty string if nothing has been recorded."""
+		lines = []
+		for operation, phasesStats in self.getPhasesStats().items():
+			# Translators: Summary line of an operation in the VoiceToggle timings report, for example "changeVoice: 12 samples"
+			lines.append(_("{operation}: {count} samples").format(operation=operation, count=phasesStats["total"]["count"]))
+			# The total time is reported after all phases
+			phases = [phase for phase in phasesStats if phase != "total"] + ["total"]
+			for phase in phases:
+				stats = phasesStats[phase]
+				# Translators: Timings of a phase in the VoiceToggle timings report, all values are in milliseconds
+				lines.append(_("{phase}: median {p50:.1f}, 95th percentile {p95:.1f}, maximum {max:.1f} ms").format(phase=phase, **stats))
+		with self.lock:
+			counters = dict(self.counters)
+		for counter, value in counters.items():
+			lines.append(f"{counter}: {value}")
+		lines.extend(extraLines)
+		# Startup times are reported only together with the recorded timings
+		if len(lines) == 0:
+			return ""
+		for name, duration in self.startupTimes.items():
+			# Translators: Time spent by a part of the add-on startup in the VoiceToggle timings report, for example "startup globalPlugin: 1.2 ms"
+			lines.append(_("startup {name}: {duration:.1f} ms").format(name=name, duration=duration * 1000))
+		return "\n".join(lines)
+
+	def dumpToLog(self, extraLines=()):
+		log.info(f"VoiceToggle timings:\n{self.getSummary(extraLines)}")
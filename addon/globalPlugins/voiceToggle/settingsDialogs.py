@@ -5,12 +5,16 @@ import addonHandler
 from synthDrivers.silence import SynthDriver as SilenceSynthDriver
 import ui
 import gui
+from gui import nvdaControls
 from gui.settingsDialogs import SettingsPanel
 
+import threading
 import weakref
 import wx
 
 import globalPlugins.voiceToggle.consts as consts
+from .voiceCatalog import Voices
+from .voiceSearchIndex import VoiceSearchIndex
 
 addonHandler.initTranslation()
 
@@ -45,9 +49,12 @@ class OptionsPanel(SettingsPanel):
 
 		sHelper = gui.guiHelper.BoxSizerHelper(self, sizer=settingsSizer)
 
-		# Translators: Label for the voices listbox in the add-on settings
-		self.voicesListBox = sHelper.addLabeledControl(_("Voices"), wx.ListBox, choices=[])
-		self.updateVoicesListBox()
+		# The list is virtual, so that only the shown rows are resolved, using the cached display names
+		# Translators: Label for the voices list in the add-on settings
+		self.voicesList = sHelper.addLabeledControl(_("Voices"), nvdaControls.AutoWidthColumnListCtrl, itemTextCallable=self.getVoicesListItemText, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.LC_NO_HEADER)
+		# Translators: Title of the column of the voices list in the add-on settings
+		self.voicesList.InsertColumn(0, _("Voice"))
+		self.updateVoicesList()
 		
 		# Buttons group
 		buttons = gui.guiHelper.ButtonHelper(wx.VERTICAL)
@@ -67,26 +74,102 @@ class OptionsPanel(SettingsPanel):
 		self.updateVoiceCheckbox = sHelper.addItem(wx.CheckBox(self, label=_("Update voice when NVDA's own speech settings change")))
 		self.updateVoiceCheckbox.SetValue(self.otherSettings["enableVoiceUpdateWhenNVDAsettingsChange"])
 
+		# Translators: Label for the keep synthesizers loaded checkbox in the add-on settings
+		self.synthPoolCheckbox = sHelper.addItem(wx.CheckBox(self, label=_("Keep recently used synthesizers loaded for faster toggling")))
+		self.synthPoolCheckbox.SetValue(self.otherSettings["enableSynthPool"])
+		self.synthPoolCheckbox.Bind(wx.EVT_CHECKBOX, self.onSynthPoolCheckboxChange)
+
+		# Translators: Label for the number of kept synthesizers spin control in the add-on settings
+		self.synthPoolSizeSpin = sHelper.addLabeledControl(_("Maximum number of kept synthesizers"), nvdaControls.SelectOnFocusSpinCtrl, min=1, max=10, initial=self.otherSettings["synthPoolSize"])
+		self.updateSynthPoolSizeSpinState()
+
+		# Translators: Label for the load synthesizers in the background checkbox in the add-on settings
+		self.asyncSynthSwitchCheckbox = sHelper.addItem(wx.CheckBox(self, label=_("Load synthesizers in the background while toggling")))
+		self.asyncSynthSwitchCheckbox.SetValue(self.otherSettings["enableAsyncSynthSwitch"])
+
+		# Translators: Label for the read voices in a separate process checkbox in the add-on settings
+		self.isolatedVoiceProbeCheckbox = sHelper.addItem(wx.CheckBox(self, label=_("Read the voices of synthesizers in a separate process")))
+		self.isolatedVoiceProbeCheckbox.SetValue(self.otherSettings["enableIsolatedVoiceProbe"])
+		# The separate process needs a Python interpreter, which only NVDA running from source has
+		self.isolatedVoiceProbeCheckbox.Enable(self.app.voiceEnumerator.pythonExecutable != None)
+
+		# Translators: Label for the rapid cycling checkbox in the add-on settings
+		self.rapidCycleCheckbox = sHelper.addItem(wx.CheckBox(self, label=_("Only announce voices when toggling repeatedly and apply the last one after a pause")))
+		self.rapidCycleCheckbox.SetValue(self.otherSettings["enableRapidCycle"])
+		self.rapidCycleCheckbox.Bind(wx.EVT_CHECKBOX, self.onRapidCycleCheckboxChange)
+
+		# Translators: Label for the pause before applying the voice spin control in the add-on settings
+		self.rapidCycleDelaySpin = sHelper.addLabeledControl(_("Pause before applying the voice (milliseconds)"), nvdaControls.SelectOnFocusSpinCtrl, min=100, max=5000, initial=self.otherSettings["rapidCycleDelay"])
+		self.updateRapidCycleDelaySpinState()
+
 	def loadSettings(self):
-		self.app.cleanUpVoiceSettings()
+		# The panel is shown right away with the last known voice settings, which are checked in the background
 		self.voiceSettings = self.app.getVoiceSettings()
 		self.otherSettings = self.app.getOtherSettings()
+		self.isCheckingVoiceSettings = True
+		self.app.checkVoiceSettings(self.voiceSettings, self.onSynthVoicesKnown, self.onVoiceSettingsChecked)
+
+	def getVoicesListItemText(self, item, column):
+		voiceSetting = self.voiceSettings[item]
+		displayName = self.app.getVoiceSettingDisplayName(voiceSetting, isBlocking=False)
+		if displayName != None:
+			return displayName
+		synthName = self.app.getSynthNameById(voiceSetting["synthId"])
+		if not self.isCheckingVoiceSettings:
+			# The voices of the synth could not be read, so the voice is shown by its ID
+			return f"{voiceSetting['voiceId']} ({voiceSetting['synthId'] if synthName == None else synthName})"
+		# Translators: Item of the voices list in the add-on settings whose voice has not been checked yet
+		return _("{synthName}, checking…").format(synthName=voiceSetting["synthId"] if synthName == None else synthName)
+
+	def onSynthVoicesKnown(self, synthId):
+		# The panel may have been closed meanwhile
+		if not hasattr(self, "app"):
+			return
+		for index, voiceSetting in enumerate(self.voiceSettings):
+			if voiceSetting["synthId"] == synthId:
+				self.voicesList.RefreshItem(index)
+
+	def onVoiceSettingsChecked(self):
+		if not hasattr(self, "app"):
+			return
+		self.isCheckingVoiceSettings = False
+		selectionIndex = self.voicesList.GetFirstSelected()
+		selectedVoiceSetting = self.voiceSettings[selectionIndex] if 0 <= selectionIndex < len(self.voiceSettings) else None
+		if self.isVoiceSettingsModified:
+			# The voices added or removed meanwhile are kept, only the invalid ones are dropped
+			validVoiceSettings = [voiceSetting for voiceSetting in self.voiceSettings if self.app.synthAndVoiceExist(voiceSetting, isBlocking=False)]
+			if len(validVoiceSettings) > 0:
+				self.voiceSettings = validVoiceSettings
+		else:
+			self.voiceSettings = self.app.getVoiceSettings()
+		newSelectionIndex = 0
+		for index, voiceSetting in enumerate(self.voiceSettings):
+			if voiceSetting is selectedVoiceSetting:
+				newSelectionIndex = index
+				break
+		self.updateVoicesList(newSelectionIndex)
+		self.updateRemoveButtonState()
+
+	def updateVoicesList(self, selectionIndex=0):
+		self.refreshVoicesListFrom(0)
+		if len(self.voiceSettings) > 0:
+			self.selectVoicesListItem(selectionIndex)
 
-	def updateVoicesListBox(self, selectionIndex=0):
-		listBoxItems = []
-		for voiceSetting in self.voiceSettings:
-			synthName = self.app.getSynthNameById(voiceSetting["synthId"])
-			voiceName = self.app.getVoiceNameById(voiceSetting["synthId"], voiceSetting["voiceId"])
-			choice = synthName if voiceSetting["synthId"] == SilenceSynthDriver.name else f"{voiceName} ({synthName})"
-			listBoxItems.append(choice)
-		self.voicesListBox.SetItems(listBoxItems)
-		if len(listBoxItems) > 0:
-			self.voicesListBox.SetSelection(selectionIndex)
+	def refreshVoicesListFrom(self, index):
+		# Only the rows which have moved are refreshed
+		self.voicesList.SetItemCount(len(self.voiceSettings))
+		if index < len(self.voiceSettings):
+			self.voicesList.RefreshItems(index, len(self.voiceSettings) - 1)
+
+	def selectVoicesListItem(self, index):
+		self.voicesList.Select(index)
+		self.voicesList.Focus(index)
 
 	def addVoiceSetting(self, setting):
-		insertIndex = 0 if len(self.voiceSettings) == 0 else self.voicesListBox.GetSelection() + 1
+		insertIndex = 0 if len(self.voiceSettings) == 0 else self.voicesList.GetFirstSelected() + 1
 		self.voiceSettings.insert(insertIndex, setting)
-		self.updateVoicesListBox(insertIndex)
+		self.refreshVoicesListFrom(insertIndex)
+		self.selectVoicesListItem(insertIndex)
 		self.updateRemoveButtonState()
 		self.isVoiceSettingsModified = True
 
@@ -98,10 +181,13 @@ class OptionsPanel(SettingsPanel):
 		if len(self.voiceSettings) == 1:
 			ui.message(_("The last remaining voice cannot be removed"))
 			return
-		selectionIndex = self.voicesListBox.GetSelection()
+		selectionIndex = self.voicesList.GetFirstSelected()
+		if selectionIndex < 0:
+			return
 		del self.voiceSettings[selectionIndex]
 		newSelectionIndex = max(0, min(selectionIndex, len(self.voiceSettings) - 1))
-		self.updateVoicesListBox(newSelectionIndex)
+		self.refreshVoicesListFrom(selectionIndex)
+		self.selectVoicesListItem(newSelectionIndex)
 		self.isVoiceSettingsModified = True
 
 	def updateRemoveButtonState(self):
@@ -110,12 +196,31 @@ class OptionsPanel(SettingsPanel):
 		else:
 			self.removeVoiceButton.Disable()
 
+	def onSynthPoolCheckboxChange(self, event):
+		self.updateSynthPoolSizeSpinState()
+
+	def updateSynthPoolSizeSpinState(self):
+		self.synthPoolSizeSpin.Enable(self.synthPoolCheckbox.GetValue())
+
+	def onRapidCycleCheckboxChange(self, event):
+		self.updateRapidCycleDelaySpinState()
+
+	def updateRapidCycleDelaySpinState(self):
+		self.rapidCycleDelaySpin.Enable(self.rapidCycleCheckbox.GetValue())
+
 	def onSave(self):
+		# Voice settings saved while still being checked are checked again by the add-on once applied
 		if self.isVoiceSettingsModified:
 			self.app.applyVoiceSettings(self.voiceSettings)
 			self.isVoiceSettingsModified = False
 
 		self.otherSettings["enableVoiceUpdateWhenNVDAsettingsChange"] = self.updateVoiceCheckbox.GetValue()
+		self.otherSettings["enableSynthPool"] = self.synthPoolCheckbox.GetValue()
+		self.otherSettings["synthPoolSize"] = self.synthPoolSizeSpin.GetValue()
+		self.otherSettings["enableAsyncSynthSwitch"] = self.asyncSynthSwitchCheckbox.GetValue()
+		self.otherSettings["enableIsolatedVoiceProbe"] = self.isolatedVoiceProbeCheckbox.GetValue()
+		self.otherSettings["enableRapidCycle"] = self.rapidCycleCheckbox.GetValue()
+		self.otherSettings["rapidCycleDelay"] = self.rapidCycleDelaySpin.GetValue()
 		self.app.applyOtherSettingsAndSave(self.otherSettings)
 
 class AddVoiceDialog(wx.Dialog):
@@ -125,6 +230,11 @@ class AddVoiceDialog(wx.Dialog):
 		self.plugin = parent
 		self.app = app
 
+		# Search indexes are kept only while the dialog is open
+		self.searchIndexes = {}
+		self.loadingSynthsIds = set()
+		self.isClosed = False
+
 		self.Bind(wx.EVT_CHAR_HOOK, self.charHook)
 		self.addWidgets()
 
@@ -143,8 +253,15 @@ class AddVoiceDialog(wx.Dialog):
 		self.synthsComboBox.Bind(wx.EVT_CHOICE, self.onSynthChange)
 		self.synthsComboBox.SetFocus()
 
-		# Translators: Label for the voices combobox in the add voice dialog
-		self.voicesComboBox = sHelper.addLabeledControl(_("Voice"), wx.Choice, choices=[])
+		# Translators: Label for the edit field filtering the voices in the add voice dialog
+		self.filterEdit = sHelper.addLabeledControl(_("Filter by"), wx.TextCtrl)
+		self.filterEdit.Bind(wx.EVT_TEXT, self.onFilterChange)
+
+		# The list is virtual, so that synths with thousands of voices are shown and filtered without creating any items
+		# Translators: Label for the voices list in the add voice dialog
+		self.voicesList = sHelper.addLabeledControl(_("Voice"), nvdaControls.AutoWidthColumnListCtrl, itemTextCallable=self.getVoicesListItemText, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.LC_NO_HEADER)
+		# Translators: Title of the column of the voices list in the add voice dialog
+		self.voicesList.InsertColumn(0, _("Voice"))
 
 		# Buttons group
 		buttons = gui.guiHelper.ButtonHelper(wx.VERTICAL)
@@ -158,7 +275,7 @@ class AddVoiceDialog(wx.Dialog):
 		cancelButton = buttons.addButton(self, label=_("Cancel"))
 		cancelButton.Bind(wx.EVT_BUTTON, self.onCancelButtonClick)
 		
-		self.updateVoiceComboBox()
+		self.updateVoices()
 		
 		sHelper.addItem(buttons)
 		mainSizer.Add(sHelper.sizer, border=10, flag=wx.ALL)
@@ -166,31 +283,79 @@ class AddVoiceDialog(wx.Dialog):
 		self.SetSizer(mainSizer)
 
 	def onSynthChange(self, event):
-		self.updateVoiceComboBox()
+		self.updateVoices()
+
+	def getSelectedSynthId(self):
+		return self.synthsIds[self.synthsComboBox.GetSelection()]
 
-	def updateVoiceComboBox(self):
-		comboBoxItems = []
-		synthSelection = self.synthsComboBox.GetSelection()
-		synthId = self.synthsIds[synthSelection]		
-		self.voicesIds = []
+	def updateVoices(self):
+		synthId = self.getSelectedSynthId()
 		if synthId == SilenceSynthDriver.name:
 		# Special treatment for silence synth
-			self.voicesIds = [SilenceSynthDriver.name]
-			comboBoxItems = [consts.SILENCE_VOICE_NAME]
+			self.voices = Voices([SilenceSynthDriver.name], [consts.SILENCE_VOICE_NAME], [None])
 		else:
+			self.voices = self.app.getVoicesForSynth(synthId, isBlocking=False)
+		self.searchIndex = self.searchIndexes.get(synthId)
+		if self.searchIndex == None and not synthId in self.loadingSynthsIds:
+			# The voices are probed if not known yet and the index is built in the background, so that synths with thousands of voices don't freeze the dialog
+			self.loadingSynthsIds.add(synthId)
+			thread = threading.Thread(target=self.buildSearchIndex, args=(synthId, self.voices), name="VoiceToggle voices search index", daemon=True)
+			thread.start()
+		self.filterVoices()
+
+	def buildSearchIndex(self, synthId, voices):
+		if voices == None:
 			voices = self.app.getVoicesForSynth(synthId)
-			if voices == None:
-
-				# Translators: Value of the voices combobox in the add voice dialog when no voices are available
-				comboBoxItems.append(_("No voices available"))
-				self.addButton.Disable()
-			else:
-				for voice in voices:
-					self.voicesIds.append(voice["id"])
-					comboBoxItems.append(voice["name"])
-				self.addButton.Enable()
-		self.voicesComboBox.SetItems(comboBoxItems)
-		self.voicesComboBox.Select(0)
+		searchIndex = None if voices == None else VoiceSearchIndex(voices)
+		wx.CallAfter(self.onSearchIndexBuilt, synthId, searchIndex)
+
+	def onSearchIndexBuilt(self, synthId, searchIndex):
+		# The dialog may have been closed meanwhile
+		if self.isClosed:
+			return
+		self.loadingSynthsIds.discard(synthId)
+		if searchIndex != None:
+			self.searchIndexes[synthId] = searchIndex
+		if synthId == self.getSelectedSynthId():
+			self.voices = None if searchIndex == None else searchIndex.voices
+			self.searchIndex = searchIndex
+			self.filterVoices()
+
+	def onFilterChange(self, event):
+		self.filterVoices()
+
+	def filterVoices(self):
+		query = self.filterEdit.GetValue()
+		if self.searchIndex != None:
+			self.filteredPositions = self.searchIndex.search(query)
+		elif self.voices != None and query.strip() == "":
+			# Until the index is built, the known voices are shown unfiltered
+			self.filteredPositions = range(len(self.voices))
+		else:
+			self.filteredPositions = []
+		itemsCount = len(self.filteredPositions)
+		if itemsCount > 0:
+			self.addButton.Enable()
+		else:
+			# The list shows a single item saying that there are no voices
+			itemsCount = 1
+			self.addButton.Disable()
+		self.voicesList.SetItemCount(itemsCount)
+		self.voicesList.RefreshItems(0, itemsCount - 1)
+		self.voicesList.Select(0)
+		self.voicesList.Focus(0)
+
+	def getVoicesListItemText(self, item, column):
+		if len(self.filteredPositions) == 0:
+			if self.getSelectedSynthId() in self.loadingSynthsIds:
+				# Translators: Item of the voices list in the add voice dialog while the voices are being loaded
+				return _("Loading voices…")
+			if self.voices == None:
+				# Translators: Item of the voices list in the add voice dialog when no voices are available
+				return _("No voices available")
+			# Translators: Item of the voices list in the add voice dialog when no voices match the filter
+			return _("No matching voices")
+		return self.voices.names[self.filteredPositions[item]]
 
 	def charHook(self, event):
 		key = event.GetKeyCode()
@@ -200,9 +365,12 @@ class AddVoiceDialog(wx.Dialog):
 			event.Skip()
 
 	def onAddButtonClick(self, event):
+		selectionIndex = self.voicesList.GetFirstSelected()
+		if selectionIndex < 0 or selectionIndex >= len(self.filteredPositions):
+			return
 		voiceSetting = {
 			"synthId": self.synthsIds[self.synthsComboBox.GetSelection()],
-			"voiceId": self.voicesIds[self.voicesComboBox.GetSelection()],
+			"voiceId": self.voices.ids[self.filteredPositions[selectionIndex]],
 		}
 		self.plugin.addVoiceSetting(voiceSetting)
 		self.close()
@@ -211,4 +379,7 @@ class AddVoiceDialog(wx.Dialog):
 		self.close()
 
 	def close(self):
+		self.isClosed = True
+		self.searchIndexes = {}
+		self.searchIndex = None
 		self.Destroy()
@@ -0,0 +1,130 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+from logHandler import log
+
+from collections import OrderedDict
+import ctypes
+import threading
+
+addonHandler.initTranslation()
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+	_fields_ = [
+		("cb", ctypes.c_ulong),
+		("PageFaultCount", ctypes.c_ulong),
+		("PeakWorkingSetSize", ctypes.c_size_t),
+		("WorkingSetSize", ctypes.c_size_t),
+		("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+		("QuotaPagedPoolUsage", ctypes.c_size_t),
+		("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+		("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+		("PagefileUsage", ctypes.c_size_t),
+		("PeakPagefileUsage", ctypes.c_size_t),
+	]
+
+def getProcessMemory():
+	# Returns the working set size of the NVDA process in bytes, or zero where it cannot be determined
+	try:
+		counters = PROCESS_MEMORY_COUNTERS()
+		counters.cb = ctypes.sizeof(counters)
+		process = ctypes.windll.kernel32.GetCurrentProcess()
+		if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+			return 0
+		return counters.WorkingSetSize
+	except (AttributeError, OSError):
+		return 0
+
+class SynthPool:
+	"""Keeps the most recently used inactive synth driver instances alive, so that toggling back to them only swaps the active instance."""
+
+	def __init__(self):
+		self.lock = threading.RLock()
+		self.isEnabled = False
+		self.maxSize = 0
+		self.maxMemory = 0
+		self.instances = OrderedDict()
+		self.memoryEstimates = {}
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def configure(self, isEnabled, maxSize, maxMemory):
+		"""Sets the pool bounds, where max memory is in megabytes and zero means no memory limit."""
+		with self.lock:
+			self.isEnabled = isEnabled
+			self.maxSize = maxSize if isEnabled else 0
+			self.maxMemory = maxMemory * 1024 * 1024
+			self.evictOverflow()
+
+	def take(self, synthId):
+		"""Removes the pooled instance of the given synth from the pool and returns it, or returns None if not pooled."""
+		with self.lock:
+			instance = self.instances.pop(synthId, None)
+			if instance == None:
+				self.misses += 1
+			else:
+				self.hits += 1
+			return instance
+
+	def peek(self, synthId):
+		with self.lock:
+			return self.instances.get(synthId)
+
+	def put(self, instance):
+		"""Adds the no longer active instance to the pool as the most recently used one, or terminates it if the pool is disabled."""
+		with self.lock:
+			if not self.isEnabled:
+				instance.terminate()
+				return
+			previousInstance = self.instances.pop(instance.name, None)
+			if previousInstance != None and previousInstance is not instance:
+				self.terminateInstance(previousInstance)
+			self.instances[instance.name] = instance
+			self.evictOverflow()
+
+	def setMemoryEstimate(self, synthId, memory):
+		with self.lock:
+			self.memoryEstimates[synthId] = memory
+
+	def getMemory(self):
+		with self.lock:
+			return sum(self.memoryEstimates.get(synthId, 0) for synthId in self.instances)
+
+	def evictOverflow(self):
+		# Least recently used instances are evicted first
+		with self.lock:
+			while len(self.instances) > self.maxSize or (self.maxMemory > 0 and len(self.instances) > 0 and self.getMemory() > self.maxMemory):
+				synthId, instance = self.instances.popitem(last=False)
+				self.evictions += 1
+				self.terminateInstance(instance)
+
+	def discard(self, synthId):
+		"""Terminates the pooled instance of the given synth, so that the synth can be instantiated again."""
+		with self.lock:
+			instance = self.instances.pop(synthId, None)
+			if instance != None:
+				self.terminateInstance(instance)
+
+	def terminateInstance(self, instance):
+		try:
+			instance.terminate()
+		except:
+			log.error(f"VoiceToggle: Error terminating pooled synth {instance.name}", exc_info=True)
+
+	def getStats(self):
+		with self.lock:
+			return {
+				"size": len(self.instances),
+				"memory": self.getMemory(),
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+			}
+
+	def terminate(self):
+		with self.lock:
+			while len(self.instances) > 0:
+				synthId, instance = self.instances.popitem(last=False)
+				self.terminateInstance(instance)
@@ -0,0 +1,91 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+from logHandler import log
+
+from concurrent.futures import ThreadPoolExecutor
+import wx
+
+from .voiceCatalog import initializeThreadCom
+
+addonHandler.initTranslation()
+
+class SynthSwitch:
+
+	def __init__(self, synthId, onLoaded):
+		self.synthId = synthId
+		self.onLoaded = onLoaded
+		self.future = None
+
+class SynthSwitcher:
+	"""Loads synth drivers in a worker thread, so that a slow driver does not block the main thread, and hands the loaded instance over to the main thread only for the latest requested switch."""
+
+	def __init__(self, loadSynth, discardSynth):
+		# Load synth is called in the worker thread, discard synth is called on the main thread with the instances of the superseded switches
+		self.loadSynth = loadSynth
+		self.discardSynth = discardSynth
+		self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="VoiceToggle synth switch", initializer=initializeThreadCom)
+		self.pendingSwitch = None
+		self.isTerminated = False
+
+	@property
+	def isPending(self):
+		return self.pendingSwitch != None
+
+	def submit(self, synthId, onLoaded):
+		"""Requests the switch to the given synth, where on loaded is called on the main thread with the loaded instance, or with None if the synth could not be loaded."""
+		pendingSwitch = self.pendingSwitch
+		if pendingSwitch != None and pendingSwitch.synthId == synthId:
+			# The driver which is already being loaded is used for the newer request
+			pendingSwitch.onLoaded = onLoaded
+			return
+		self.cancel()
+		switch = SynthSwitch(synthId, onLoaded)
+		self.pendingSwitch = switch
+		switch.future = self.executor.submit(self.load, switch)
+
+	def load(self, switch):
+		# Runs in the worker thread, where switches superseded before their loading started are skipped
+		if switch is not self.pendingSwitch:
+			return
+		try:
+			instance = self.loadSynth(switch.synthId)
+		except:
+			log.error(f"VoiceToggle: Unable to instantiate synth {switch.synthId}", exc_info=True)
+			instance = None
+		wx.CallAfter(self.finish, switch, instance)
+
+	def finish(self, switch, instance):
+		if self.isTerminated:
+			if instance != None:
+				instance.terminate()
+			return
+		if switch is not self.pendingSwitch:
+			if instance != None:
+				self.discardSynth(instance)
+			return
+		self.pendingSwitch = None
+		switch.onLoaded(instance)
+
+	def cancel(self):
+		"""Cancels the pending switch, where the driver which is already being loaded is discarded once loaded."""
+		switch = self.pendingSwitch
+		if switch == None:
+			return
+		self.pendingSwitch = None
+		switch.future.cancel()
+
+	def wait(self):
+		# Waits until the driver of the pending switch has been loaded, the switch itself still happens on the main thread
+		switch = self.pendingSwitch
+		if switch != None:
+			try:
+				switch.future.result()
+			except:
+				pass
+
+	def terminate(self):
+		self.cancel()
+		self.isTerminated = True
+		self.executor.shutdown(wait=False)
@@ -0,0 +1,180 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+import buildVersion
+import globalVars
+from logHandler import log
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+
+addonHandler.initTranslation()
+
+# Version 2 added the languages of the voices, version 3 stores the voices of each synth as parallel lists
+CATALOG_VERSION = 3
+CATALOG_FILE_NAME = "voiceToggleCatalog.json"
+
+def getDriverFingerprint(synthId):
+	# The fingerprint changes whenever NVDA or the synth driver module is updated, which is when the voices list may change
+	fingerprint = [buildVersion.version]
+	try:
+		spec = importlib.util.find_spec(f"synthDrivers.{synthId}")
+	except (ImportError, ValueError):
+		spec = None
+	if spec != None and spec.origin != None:
+		fingerprint.append(spec.origin)
+		try:
+			stat = os.stat(spec.origin)
+			fingerprint.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+		except OSError:
+			pass
+	return "|".join(fingerprint)
+
+def initializeThreadCom():
+	# Many synth drivers use COM, which must be initialized in each thread that instantiates them
+	try:
+		import comtypes
+		comtypes.CoInitializeEx(comtypes.COINIT_APARTMENTTHREADED)
+		return True
+	except (ImportError, OSError):
+		return False
+
+def internOptional(text):
+	return None if text == None else sys.intern(text)
+
+class Voices:
+	"""Voices of a synth stored as parallel tuples of the interned IDs, names and interned languages, with the positions of the voices indexed by their IDs.
+	The voices are never modified, so that they can be shared by the catalog, the dialogs and announcements without copying.
+	"""
+	__slots__ = ("ids", "names", "languages", "positions")
+
+	def __init__(self, ids, names, languages):
+		self.ids = tuple(sys.intern(voiceId) for voiceId in ids)
+		self.names = tuple(names)
+		self.languages = tuple(internOptional(language) for language in languages)
+		self.positions = {voiceId: position for position, voiceId in enumerate(self.ids)}
+
+	@classmethod
+	def fromSynth(cls, synth):
+		voices = synth.availableVoices
+		voicesInfos = [voices[voiceId] for voiceId in voices]
+		return cls(voices.keys(), [voiceInfo.displayName for voiceInfo in voicesInfos], [getattr(voiceInfo, "language", None) for voiceInfo in voicesInfos])
+
+	@classmethod
+	def fromData(cls, data):
+		return cls(data["ids"], data["names"], data["languages"])
+
+	def toData(self):
+		return {
+			"ids": self.ids,
+			"names": self.names,
+			"languages": self.languages,
+		}
+
+	def getName(self, voiceId):
+		position = self.positions.get(voiceId)
+		return None if position == None else self.names[position]
+
+	def __contains__(self, voiceId):
+		return voiceId in self.positions
+
+	def __len__(self):
+		return len(self.ids)
+
+	def __eq__(self, other):
+		if not isinstance(other, Voices):
+			return NotImplemented
+		return self.ids == other.ids and self.names == other.names and self.languages == other.languages
+
+	__hash__ = None
+
+class VoiceCatalog:
+	"""Persistent cache of the synthesizers voices lists, so that synth drivers don't need to be instantiated after each NVDA restart."""
+
+	def __init__(self, path=None):
+		self.path = path if path != None else os.path.join(globalVars.appArgs.configPath, CATALOG_FILE_NAME)
+		self.lock = threading.RLock()
+		self.entries = {}
+		self.fingerprints = {}
+		self.isDirty = False
+		self.isLoaded = False
+
+	def ensureLoaded(self):
+		# The catalog file is read on first use rather than during NVDA startup
+		with self.lock:
+			if not self.isLoaded:
+				self.isLoaded = True
+				self.load()
+
+	def load(self):
+		try:
+			with open(self.path, "r", encoding="utf-8") as file:
+				data = json.load(file)
+		except FileNotFoundError:
+			return
+		except (OSError, ValueError):
+			log.warning("VoiceToggle: Unable to read the voice catalog, starting with an empty one", exc_info=True)
+			return
+
+		# Catalogs written by other versions of VoiceToggle are discarded and rebuilt
+		if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+			return
+		entries = data.get("synths", {})
+		if not isinstance(entries, dict):
+			return
+		for synthId, entry in entries.items():
+			try:
+				self.entries[synthId] = {
+					"fingerprint": entry["fingerprint"],
+					"voices": Voices.fromData(entry["voices"]),
+				}
+			except (KeyError, TypeError):
+				log.warning(f"VoiceToggle: Skipping invalid voice catalog entry of synth {synthId}")
+
+	def save(self):
+		with self.lock:
+			if not self.isDirty:
+				return
+			data = {
+				"version": CATALOG_VERSION,
+				"synths": {synthId: {"fingerprint": entry["fingerprint"], "voices": entry["voices"].toData()} for synthId, entry in self.entries.items()},
+			}
+			tempPath = self.path + ".tmp"
+			try:
+				with open(tempPath, "w", encoding="utf-8") as file:
+					json.dump(data, file, ensure_ascii=False)
+				os.replace(tempPath, self.path)
+				self.isDirty = False
+			except OSError:
+				log.warning("VoiceToggle: Unable to write the voice catalog", exc_info=True)
+
+	def getFingerprint(self, synthId):
+		# Drivers cannot change while NVDA is running, so the fingerprint is computed only once per synth
+		with self.lock:
+			if not synthId in self.fingerprints:
+				self.fingerprints[synthId] = getDriverFingerprint(synthId)
+			return self.fingerprints[synthId]
+
+	def getVoices(self, synthId):
+		with self.lock:
+			self.ensureLoaded()
+			entry = self.entries.get(synthId)
+			if entry == None or entry.get("fingerprint") != self.getFingerprint(synthId):
+				return None
+			return entry["voices"]
+
+	def setVoices(self, synthId, voices):
+		with self.lock:
+			self.ensureLoaded()
+			self.entries[synthId] = {
+				"fingerprint": self.getFingerprint(synthId),
+				"voices": voices,
+			}
+			self.isDirty = True
+
+	def terminate(self):
+		self.save()
@@ -0,0 +1,74 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Worker process which instantiates a single synth driver and writes the IDs, names and languages of its voices as JSON to the standard output.
+
+It imports only the standard library and the synth driver itself, as it runs in a separate Python process without NVDA or the add-on loaded.
+
+Usage: python voiceEnumerationWorker.py <drivers package> <drivers package path JSON> <synth ID>
+
+Exits with NEEDS_NVDA_EXIT_CODE if importing or instantiating the driver raised an exception, which most drivers do without a running NVDA, and with any other non-zero code if the worker failed otherwise.
+"""
+
+import importlib
+import json
+import os
+import sys
+import traceback
+
+# Exit code reported when the driver raised an exception, so that its voices can be read in NVDA instead
+NEEDS_NVDA_EXIT_CODE = 3
+
+def initializeCom():
+	# Many synth drivers use COM, which must be initialized in the process that instantiates them
+	try:
+		import comtypes
+		comtypes.CoInitializeEx(comtypes.COINIT_APARTMENTTHREADED)
+	except (ImportError, OSError):
+		pass
+
+def getVoicesData(packageName, packagePath, synthId):
+	# The package path includes the directories of the drivers installed by add-ons, which only the parent process knows
+	package = importlib.import_module(packageName)
+	package.__path__ = list(packagePath)
+	module = importlib.import_module(f"{packageName}.{synthId}")
+	instance = module.SynthDriver()
+	voices = instance.availableVoices
+	voicesInfos = [voices[voiceId] for voiceId in voices]
+	data = {
+		"ids": list(voices.keys()),
+		"names": [voiceInfo.displayName for voiceInfo in voicesInfos],
+		"languages": [getattr(voiceInfo, "language", None) for voiceInfo in voicesInfos],
+	}
+	try:
+		instance.terminate()
+	except Exception:
+		pass
+	return data
+
+def main():
+	packageName, packagePathJson, synthId = sys.argv[1:4]
+
+	# Anything the driver prints goes to the standard error, so that only the result is written to the standard output
+	resultFile = sys.stdout
+	sys.stdout = sys.stderr
+	initializeCom()
+	try:
+		data = getVoicesData(packageName, json.loads(packagePathJson), synthId)
+	except Exception:
+		traceback.print_exc()
+		sys.stderr.flush()
+		os._exit(NEEDS_NVDA_EXIT_CODE)
+	try:
+		resultFile.write(json.dumps(data, ensure_ascii=True) + "\n")
+		resultFile.flush()
+	except BaseException:
+		traceback.print_exc()
+		sys.stderr.flush()
+		os._exit(1)
+
+	# Threads and other resources leaked by the driver must not keep the process alive
+	os._exit(0)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,84 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+from logHandler import log
+
+import importlib
+import json
+import os
+import subprocess
+import sys
+
+import globalPlugins.voiceToggle.consts as consts
+from .voiceCatalog import Voices
+from .voiceEnumerationWorker import NEEDS_NVDA_EXIT_CODE
+
+addonHandler.initTranslation()
+
+class VoiceEnumerationError(Exception):
+	"""Raised when the process reading the voices of a synth crashed, was killed because it did not finish in time, or returned invalid voices."""
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voiceEnumerationWorker.py")
+
+def getPythonExecutable():
+	# Frozen builds of NVDA contain no Python interpreter which could run the worker, only NVDA running from source has one
+	if getattr(sys, "frozen", None) != None:
+		return None
+	executable = sys.executable
+	if not executable or not os.path.isfile(executable):
+		return None
+	return executable
+
+class VoiceEnumerator:
+	"""Reads the voices of synth drivers in a separate Python process, which is killed if it does not finish in time, so that drivers which hang, crash or leak resources cannot affect NVDA."""
+
+	def __init__(self, driversPackage="synthDrivers", timeout=consts.VOICE_PROBE_TIMEOUT):
+		self.driversPackage = driversPackage
+		self.timeout = timeout
+		self.pythonExecutable = getPythonExecutable()
+		self.isEnabled = False
+
+	@property
+	def isAvailable(self):
+		return self.isEnabled and self.pythonExecutable != None
+
+	def enable(self, isEnabled):
+		self.isEnabled = isEnabled
+
+	def getVoices(self, synthId):
+		"""Returns the voices of the given synth read by the worker process, or None if the driver raised an exception in the worker, as it needs a running NVDA.
+		Raises VoiceEnumerationError if the worker could not be started, crashed, did not finish in time or returned invalid voices.
+		"""
+		# The worker gets the same module search path, and the drivers directories of the add-ons as well
+		packagePath = list(importlib.import_module(self.driversPackage).__path__)
+		args = [self.pythonExecutable, WORKER_PATH, self.driversPackage, json.dumps(packagePath), synthId]
+		env = dict(os.environ)
+		env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+		try:
+			process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+		except OSError:
+			log.warning(f"VoiceToggle: Unable to start the process reading the voices of synth {synthId}", exc_info=True)
+			raise VoiceEnumerationError(synthId)
+		try:
+			stdout, stderr = process.communicate(timeout=self.timeout)
+		except subprocess.TimeoutExpired:
+			# The output is not read after killing the process, as processes started by the driver may keep the pipes open
+			process.kill()
+			process.wait()
+			process.stdout.close()
+			process.stderr.close()
+			log.warning(f"VoiceToggle: Reading the voices of synth {synthId} did not finish in {self.timeout} seconds, the process has been killed")
+			raise VoiceEnumerationError(synthId)
+		if process.returncode == NEEDS_NVDA_EXIT_CODE:
+			log.debug(f"VoiceToggle: The driver of synth {synthId} cannot be instantiated outside of NVDA: {stderr.decode('utf-8', errors='replace')[-1000:]}")
+			return None
+		if process.returncode != 0:
+			# Crashes of the driver, including those ending the process by a signal, would crash NVDA as well
+			log.warning(f"VoiceToggle: The process reading the voices of synth {synthId} crashed with exit code {process.returncode}: {stderr.decode('utf-8', errors='replace')[-1000:]}")
+			raise VoiceEnumerationError(synthId)
+		try:
+			return Voices.fromData(json.loads(stdout.decode("utf-8").splitlines()[-1]))
+		except (IndexError, KeyError, TypeError, ValueError):
+			log.warning(f"VoiceToggle: Invalid voices of synth {synthId} read by the worker process", exc_info=True)
+			raise VoiceEnumerationError(synthId)
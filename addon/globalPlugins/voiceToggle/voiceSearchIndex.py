@@ -0,0 +1,60 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import addonHandler
+
+from array import array
+from bisect import bisect_left
+import re
+import sys
+
+addonHandler.initTranslation()
+
+# Names, IDs and language tags are split into tokens at any character which is not a letter or a digit
+TOKEN_SEPARATORS = re.compile(r"[\W_]+")
+
+# IDs which are paths, like the registry paths of the SAPI and OneCore voice tokens, are indexed only by their last part
+PATH_SEPARATORS = re.compile(r"[\\/]")
+
+# Appended to a prefix, sorts after all tokens starting with that prefix
+LAST_CHARACTER = chr(sys.maxunicode)
+
+def getTokens(text):
+	return [token for token in TOKEN_SEPARATORS.split(text.lower()) if token != ""]
+
+def getIdTokens(voiceId):
+	return getTokens(PATH_SEPARATORS.split(voiceId)[-1])
+
+class VoiceSearchIndex:
+	"""Sorted list of the tokens of the voices names, IDs and languages, each paired with the position of its voice in the voices list, so that the voices having a token with a given prefix form a single range found by bisection."""
+
+	def __init__(self, voices):
+		self.voices = voices
+		self.allPositions = range(len(voices))
+		entries = []
+		for position, (voiceId, name, language) in enumerate(zip(voices.ids, voices.names, voices.languages)):
+			tokens = set(getTokens(name) + getIdTokens(voiceId) + getTokens(language or ""))
+			entries.extend((sys.intern(token), position) for token in tokens)
+		entries.sort()
+		self.tokens = [token for token, position in entries]
+		self.positions = array("I", [position for token, position in entries])
+
+	def getPrefixPositions(self, prefix):
+		start = bisect_left(self.tokens, prefix)
+		end = bisect_left(self.tokens, prefix + LAST_CHARACTER, start)
+		return set(self.positions[start:end])
+
+	def search(self, query):
+		"""Returns the sorted positions of the voices, where each token of the query is a prefix of some token of the voice."""
+		queryTokens = getTokens(query)
+		if len(queryTokens) == 0:
+			return self.allPositions
+
+		# Longer tokens usually match fewer voices, so intersecting from them keeps the sets small
+		queryTokens.sort(key=len, reverse=True)
+		positions = self.getPrefixPositions(queryTokens[0])
+		for token in queryTokens[1:]:
+			if len(positions) == 0:
+				break
+			positions &= self.getPrefixPositions(token)
+		return sorted(positions)
@@ -5,298 +5,745 @@ from synthSettingsRing import SynthSettingsRing
 import addonHandler
 import synthDriverHandler
 from synthDriverHandler import getSynth, setSynth, getSynthList, getSynthInstance
+import synthDrivers
 from synthDrivers.silence import SynthDriver as SilenceSynthDriver
 import config
+from logHandler import log
 import ui
 
-import json
-from threading import Timer
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed, wait
+import os
+import sys
+import threading
+import time
 import wx
 
 import globalPlugins.voiceToggle.consts as consts
 from .settingsDialogs import OptionsPanel
+from .changeJournal import ChangeJournal
+from .configStore import ConfigStore
+from .perfTrace import PerfTrace
+from .synthPool import SynthPool, getProcessMemory
+from .synthSwitcher import SynthSwitcher
+from .voiceCatalog import VoiceCatalog, Voices, initializeThreadCom
+from .voiceEnumerator import VoiceEnumerator, VoiceEnumerationError
 
 addonHandler.initTranslation()
 
+def getVoiceSettingFingerprint(voiceSetting):
+	return (voiceSetting["synthId"], voiceSetting["voiceId"]) + tuple(voiceSetting.get(param) for param in consts.SAVED_PARAMS)
+
 class VoiceToggle:
 
 	def __init__(self):
 		OptionsPanel.setAppInstance(self)
-		config.conf.spec["VoiceToggle"] = consts.CONFIG_SPEC
 
 		self.preventVoiceSettingsUpdate = False
-		self.hasProfileSwitchedPreviously = False
 		self.voiceSettingsToRevert = None
+		self.voiceSettingsToRevertDeadline = 0
 		self.isVoiceSettingsModified = False
 		self.currentProfileName = consts.NORMAL_PROFILE_NAME
-		self.synthsWithVoices = []
+		self.synthsWithVoices = {}
+		self.synthListFingerprint = None
+		self.voiceSettingsGeneration = 0
+		self.validatedVoiceSettingsGeneration = -1
+		self.synthDriverLocks = {}
+		self.voiceProbeFutures = {}
+		self.voiceProbeLock = threading.RLock()
+		self.isTerminated = False
+		self.voiceProbeExecutor = ThreadPoolExecutor(max_workers=consts.VOICE_PROBE_MAX_WORKERS, thread_name_prefix="VoiceToggle voice probe", initializer=initializeThreadCom)
+		self.voiceCatalog = VoiceCatalog()
+		self.voiceEnumerator = VoiceEnumerator()
+		self.synthPool = SynthPool()
+		self.synthSwitcher = SynthSwitcher(self.loadSynth, self.discardLoadedSynth)
+		self.perfTrace = PerfTrace(consts.PERF_TRACE_SIZE)
+		self.isSynthSettingsDirty = False
+		self.synthSettingsProfile = None
+		self.dirtySynthVoiceSetting = None
+		self.isSettingsDirty = False
+		self.flushTimer = None
+		self.pendingVoiceSettingsIndex = None
+		self.pendingVoiceTimer = None
+		self.ringParamsValues = {}
+		self.ringSettingsParams = {}
+		self.configStore = ConfigStore(self.getConfig, self.setConfig)
+		self.changeJournal = ChangeJournal()
+		self.voiceSettingsPositions = {}
+		self.displayNames = {}
+		self.nextVoiceSettingId = 0
+		self.appliedSynth = None
+		self.voicesReadSynth = None
+		self.appliedVoiceFingerprint = None
+		self.profileSwitchQuietDeadline = 0
+		self.isProfileVoicePending = False
+		self.profileVoiceTimer = None
 
 		self.loadSettingsFromConfig()
+		self.configureSynthPool()
+		self.voiceEnumerator.enable(self.otherSettings["enableIsolatedVoiceProbe"])
+		self.perfTrace.enable(self.otherSettings["enablePerfTrace"])
 		self.addDefaultVoiceSetting()
 		self.monkeyPatch()
+		self.warmUpVoices()
 
 	@property
 	def currentVoiceSettingsIndex(self):
-		return self.profilesVoiceSettingsIndices[self.currentProfileName]
+		# Profiles are bound to the IDs of the voice settings, so that their bindings survive insertions and deletions of other voice settings
+		index = self.voiceSettingsPositions.get(self.profilesVoiceSettingsIds.get(self.currentProfileName))
+		if index == None:
+			return 0 if len(self.voiceSettings) > 0 else -1
+		return index
 
 	@currentVoiceSettingsIndex.setter
 	def currentVoiceSettingsIndex(self, value):
-		self.profilesVoiceSettingsIndices[self.currentProfileName] = value
+		self.foldRingParamsValues()
+		self.setProfileVoiceSettingId(self.currentProfileName, self.getVoiceSettingId(value))
+
+	def getVoiceSettingId(self, index):
+		if index < 0 or index >= len(self.voiceSettings):
+			return None
+		return self.voiceSettings[index]["id"]
+
+	def setProfileVoiceSettingId(self, profileName, voiceSettingId):
+		if self.profilesVoiceSettingsIds.get(profileName, -1) != voiceSettingId:
+			self.changeJournal.append(["profileVoice", profileName, voiceSettingId])
+			self.markSettingsDirty()
+		self.profilesVoiceSettingsIds[profileName] = voiceSettingId
+
+	def indexVoiceSettings(self):
+		"""Assigns IDs to the new voice settings and rebuilds the map of the voice settings IDs to their positions after the voice settings list has changed."""
+		for voiceSetting in self.voiceSettings:
+			if "id" in voiceSetting and voiceSetting["id"] >= self.nextVoiceSettingId:
+				self.nextVoiceSettingId = voiceSetting["id"] + 1
+		for voiceSetting in self.voiceSettings:
+			if not "id" in voiceSetting:
+				voiceSetting["id"] = self.nextVoiceSettingId
+				self.nextVoiceSettingId += 1
+		self.voiceSettingsPositions = {voiceSetting["id"]: index for index, voiceSetting in enumerate(self.voiceSettings)}
+
+	def rebindProfiles(self, replacementsIds):
+		# Only the profiles bound to removed voice settings are rebound, to the given replacements
+		for profileName, voiceSettingId in list(self.profilesVoiceSettingsIds.items()):
+			if voiceSettingId in replacementsIds:
+				self.setProfileVoiceSettingId(profileName, replacementsIds[voiceSettingId])
 
 
 	def monkeyPatch(self):
 		synthDriverHandler.changeVoice = self.mpChangeVoice(synthDriverHandler.changeVoice)
+		synthDriverHandler.setSynth = self.mpSetSynth(synthDriverHandler.setSynth)
 		for methodName in ["first", "last", "increase", "increaseLarge", "decrease", "decreaseLarge"]:
 			setattr(SynthSettingsRing, methodName, self.mpRingChangeValue(getattr(SynthSettingsRing, methodName)))
 
-	def resetVoiceSettingsToRevert(self):
-		if not self.hasProfileSwitchedPreviously:
+	def getVoiceSettingsToRevert(self):
+		# The revert window is checked lazily, so that no timer is needed to close it
+		if self.voiceSettingsToRevert != None and time.monotonic() >= self.voiceSettingsToRevertDeadline:
 			self.voiceSettingsToRevert = None
+		return self.voiceSettingsToRevert
+
+	def cancelVoiceSettingsToRevert(self):
+		self.voiceSettingsToRevert = None
+		self.voiceSettingsToRevertDeadline = 0
 
 	def mpChangeVoice(self, func):
 		def orig(synth, voiceId):
+			if threading.current_thread() is not threading.main_thread():
+				# Synths instantiated in the background only get their voice, as the settings ring and the voice dictionary belong to the active synth
+				if voiceId:
+					synth.voice = voiceId
+				return None
 			ret = func(synth, voiceId)
 
 			# We don't want synth and voice settings to be updated when getting synth instance or when setting new synth during toggle
 			if self.preventVoiceSettingsUpdate:
 				return ret
 
-			self.hasProfileSwitchedPreviously = False
-
-			# After some delay, consider the synth and voice change not to be caused by profile switching
-			timer = Timer(0.2, self.resetVoiceSettingsToRevert)
-			timer.start()
+			# The voice chosen in NVDA settings takes precedence over the voice not yet applied by rapid cycling
+			self.cancelPendingVoice()
+			self.appliedVoiceFingerprint = None
 
 			# Skip voice update if configured so
 			if not self.otherSettings["enableVoiceUpdateWhenNVDAsettingsChange"]:
 				return ret
 
-			if self.voiceSettingsToRevert == None:
+			if self.getVoiceSettingsToRevert() == None:
 				currentVoiceSettings = self.voiceSettings[self.currentVoiceSettingsIndex]
 				self.voiceSettingsToRevert = {
 					"synthId": currentVoiceSettings["synthId"],
 					"voiceId": currentVoiceSettings["voiceId"]
 				}
+
+			# Until some delay after the last synth and voice change, consider the change to be possibly caused by profile switching
+			self.voiceSettingsToRevertDeadline = time.monotonic() + consts.VOICE_SETTINGS_REVERT_WINDOW
 			synthId = SilenceSynthDriver.name if synth == None else synth.name
 			if synth == None:
 				voiceId = SilenceSynthDriver.name
+			else:
+				self.ensureVoiceKnown(synth, voiceId)
 			self.updateVoiceSettingSynthAndVoice(synthId, voiceId)
 			return ret
 		return orig
 	
+	def mpSetSynth(self, func):
+		def orig(name, *args, **kwargs):
+			# The synth chosen in NVDA settings supersedes the switch still loading in the background
+			self.synthSwitcher.cancel()
+			# A pooled instance must be terminated before the same synth is instantiated again
+			if name != None:
+				self.synthPool.discard(name)
+			return func(name, *args, **kwargs)
+		return orig
+
 	def mpRingChangeValue(self, method):
 		def orig(origSelf):
-			param = origSelf.currentSettingName.lower()
+			# The settings ring must change the voice which has been announced by rapid cycling
+			if self.pendingVoiceSettingsIndex != None:
+				self.applyPendingVoice()
+			settingName = origSelf.currentSettingName
 			ret = method(origSelf)
-			if not param in consts.SAVED_PARAMS:
+			try:
+				param = self.ringSettingsParams[settingName]
+			except KeyError:
+				param = self.getRingSettingParam(settingName)
+			if param == None:
 				return ret
-			self.updateVoiceSettingParam(param, int(ret))
+
+			# Only the latest value is kept, and it is written to the voice setting once it is needed, so that holding a ring key costs almost nothing
+			if not self.ringParamsValues:
+				self.markSettingsDirty()
+			self.ringParamsValues[param] = int(ret)
 			return ret
 		return orig
 
+	def getRingSettingParam(self, settingName):
+		param = None if settingName == None else settingName.lower()
+		if not param in consts.TRACKED_PARAMS:
+			param = None
+		self.ringSettingsParams[settingName] = param
+		return param
+
+	def foldRingParamsValues(self):
+		if not self.ringParamsValues:
+			return
+		ringParamsValues = self.ringParamsValues
+		self.ringParamsValues = {}
+		for param, value in ringParamsValues.items():
+			self.updateVoiceSettingParam(param, value)
+
 	def handleProfileSwitch(self):
-		self.hasProfileSwitchedPreviously = True
+		with self.perfTrace.operation("handleProfileSwitch"):
+			self.switchProfile()
+
+			# Profile switches following shortly after the previous one are coalesced, and only the voice of the last profile is applied once the switching settles
+			now = time.monotonic()
+			isSwitchingRapidly = now < self.profileSwitchQuietDeadline
+			self.profileSwitchQuietDeadline = now + consts.PROFILE_SWITCH_COALESCE_DELAY / 1000
+			if isSwitchingRapidly:
+				self.perfTrace.count("coalescedProfileSwitches")
+				self.isProfileVoicePending = True
+				if self.profileVoiceTimer == None:
+					self.profileVoiceTimer = wx.CallLater(consts.PROFILE_SWITCH_COALESCE_DELAY, self.applyPendingProfileVoice)
+				else:
+					self.profileVoiceTimer.Start(consts.PROFILE_SWITCH_COALESCE_DELAY)
+			else:
+				self.applyProfileVoice()
+
+	def applyPendingProfileVoice(self):
+		if not self.isProfileVoicePending:
+			return
+		with self.perfTrace.operation("handleProfileSwitch"):
+			self.applyProfileVoice()
+
+	def switchProfile(self):
+		# Values changed by the settings ring belong to the voice of the previous profile, so they are written to it before the profile changes
+		self.foldRingParamsValues()
+
+		# The voice chosen by rapid cycling is kept for the previous profile, but there is no need to apply it anymore
+		self.commitPendingVoice()
 		newProfileName = config.conf.profiles[-1].name
 		if not newProfileName:
 			newProfileName = consts.NORMAL_PROFILE_NAME
 
 		# Reverting hack is necessarybecause NVDA is missing a pre profile switch extension point 
-		if self.voiceSettingsToRevert != None:
-			self.updateVoiceSettingSynthAndVoice(self.voiceSettingsToRevert["synthId"], self.voiceSettingsToRevert["voiceId"])
+		voiceSettingsToRevert = self.getVoiceSettingsToRevert()
+		if voiceSettingsToRevert != None:
+			self.updateVoiceSettingSynthAndVoice(voiceSettingsToRevert["synthId"], voiceSettingsToRevert["voiceId"])
+
+		# NVDA has already loaded the synth settings of the new profile, so the deferred ones are written to the previous profile directly
+		self.flushSynthSettingsToProfile()
 			
-		if not (newProfileName in self.profilesVoiceSettingsIndices):
-			self.profilesVoiceSettingsIndices[newProfileName] = self.currentVoiceSettingsIndex
+		if not (newProfileName in self.profilesVoiceSettingsIds):
+			self.setProfileVoiceSettingId(newProfileName, self.getVoiceSettingId(self.currentVoiceSettingsIndex))
 		self.currentProfileName = newProfileName
-		if self.voiceSettingsToRevert != None:
-			self.voiceSettingsToRevert = None
+		self.cancelVoiceSettingsToRevert()
 
-		# Ignore the synth and voice settings saved in the profile and switch to the VoiceToggle settings instead
-		self.changeVoice(self.currentVoiceSettingsIndex, announceChange=False)
+	def applyProfileVoice(self):
+		self.isProfileVoicePending = False
+		self.flushSettings()
 
-	def cleanUpVoiceSettings(self):
-		self.updateSynthsWithVoices()
-		self.currentVoiceSettingsIndex = self.deleteInvalidVoiceSettings(startIndex=self.currentVoiceSettingsIndex)
+		# Ignore the synth and voice settings saved in the profile and switch to the VoiceToggle settings instead, unless they are the same
+		if self.isCurrentVoiceSettingActive():
+			self.perfTrace.count("profileSwitchFastPath")
+		else:
+			self.changeVoice(self.currentVoiceSettingsIndex, announceChange=False)
+
+	def isCurrentVoiceSettingActive(self):
+		# The live synth settings are checked in the configuration, where NVDA keeps the settings it applies on profile switch, so that no driver is touched
+		index = self.currentVoiceSettingsIndex
+		if self.isVoiceSettingsModified or self.synthSwitcher.isPending or not self.isVoiceSettingsValidated() or index < 0 or index >= len(self.voiceSettings):
+			return False
+		voiceSetting = self.voiceSettings[index]
+		if getSynth() is not self.appliedSynth or getVoiceSettingFingerprint(voiceSetting) != self.appliedVoiceFingerprint:
+			return False
+		if voiceSetting["synthId"] == SilenceSynthDriver.name:
+			return True
+		try:
+			synthConfig = config.conf["speech"][voiceSetting["synthId"]]
+			if synthConfig["voice"] != voiceSetting["voiceId"]:
+				return False
+			for param in consts.SAVED_PARAMS:
+				if param in voiceSetting and synthConfig[param] != voiceSetting[param]:
+					return False
+		except KeyError:
+			return False
+		return True
+
+	def cleanUpVoiceSettings(self, synthsInfos=None, isBlocking=True):
+		self.applyPendingVoice()
+		self.foldRingParamsValues()
+		self.updateSynthsWithVoices(synthsInfos)
+		self.currentVoiceSettingsIndex = self.deleteInvalidVoiceSettings(startIndex=self.currentVoiceSettingsIndex, isBlocking=isBlocking)
 		self.addDefaultVoiceSetting()
 
-	def deleteInvalidVoiceSettings(self, startIndex=0, dontChangeVoice=False):
-		newValidIndex = startIndex
-		doChangeVoice = False
+	def checkVoiceSettings(self, voiceSettings, onSynthVoicesKnown, onChecked):
+		"""Resolves the synths list and the voices of the synths of the given voice settings in a background thread, and then cleans up the voice settings.
+		On synth voices known is called on the main thread with the ID of each synth once its voices are known, and on checked once the voice settings have been cleaned up.
+		"""
+		synthsIds = list(dict.fromkeys(voiceSetting["synthId"] for voiceSetting in voiceSettings))
+		thread = threading.Thread(target=self.runVoiceSettingsCheck, args=(synthsIds, onSynthVoicesKnown, onChecked), name="VoiceToggle voice settings check", daemon=True)
+		thread.start()
+
+	def runVoiceSettingsCheck(self, synthsIds, onSynthVoicesKnown, onChecked):
+		synthsInfos = getSynthList()
+		installedSynthsIds = {synthInfo[0] for synthInfo in synthsInfos}
+		synth = getSynth()
+		futures = {}
+		for synthId in synthsIds:
+			# The voices of the active synth are read on the main thread once the check finishes
+			if synthId == SilenceSynthDriver.name or not synthId in installedSynthsIds or (synth != None and synth.name == synthId):
+				continue
+			if self.voiceCatalog.getVoices(synthId) == None:
+				futures[self.getVoicesProbeFuture(synthId)] = synthId
+			else:
+				wx.CallAfter(onSynthVoicesKnown, synthId)
 
-		# Start deleting from start index
-		index = self.findNextInvalid(startIndex)
+		# Synths are probed in parallel, and their voices are shown as soon as each probe finishes
+		for future in as_completed(futures):
+			wx.CallAfter(onSynthVoicesKnown, futures[future])
+		wx.CallAfter(self.finishVoiceSettingsCheck, synthsInfos, onChecked)
 
-		voiceSettingsLength = len(self.voiceSettings)
-		while voiceSettingsLength > 0 and index >= 0:
-			del self.voiceSettings[index]
-			voiceSettingsLength = len(self.voiceSettings)
+	def finishVoiceSettingsCheck(self, synthsInfos, onChecked):
+		# Voices of the synths whose probes failed are not probed again, their voice settings are kept instead of blocking the main thread
+		self.cleanUpVoiceSettings(synthsInfos, isBlocking=False)
+		onChecked()
 
-			# If some setting before the current one has been deleted, shift the current index to the previous index and change the voice
-			if index < self.currentVoiceSettingsIndex:
-				self.currentVoiceSettingsIndex -= 1
-				doChangeVoice = True
+	def deleteInvalidVoiceSettings(self, startIndex=0, dontChangeVoice=False, isBlocking=True):
+		oldCurrentIndex = self.currentVoiceSettingsIndex
+		oldVoiceSettings = self.voiceSettings.copy()
+		indicesMap, deletedIndices = self.compactVoiceSettings(isBlocking)
 
-			# If setting at the same index as the current setting has been deleted, change the voice
-			elif index == self.currentVoiceSettingsIndex:
-				doChangeVoice = True
-				
-			# If some setting before the start index has been deleted, shift the new valid index to the previous index
-			if index < startIndex:
-				newValidIndex -= 1
+		# The profiles bound to deleted settings are bound to the next valid setting
+		if len(deletedIndices) > 0:
+			self.rebindProfiles({oldVoiceSettings[index]["id"]: self.getVoiceSettingId(indicesMap[index]) for index in deletedIndices})
+			self.journalVoiceSettings()
+			self.markSettingsDirty()
 
-			index = self.findNextInvalid(index)
+		self.validatedVoiceSettingsGeneration = self.voiceSettingsGeneration
 
 		# Check if list has been deleted entirely or was originally empty
-		if voiceSettingsLength == 0:
-			self.currentVoiceSettingsIndex = -1
+		if len(self.voiceSettings) == 0:
 			return -1
-		
+
+		# The current profile stays bound to its setting, so the voice changes only if the current setting has been deleted
+		doChangeVoice = oldCurrentIndex in deletedIndices
 		if doChangeVoice and not dontChangeVoice:
 			self.isVoiceSettingsModified = True
 			self.changeVoice(self.currentVoiceSettingsIndex, announceChange=False)
+		return self.remapVoiceSettingsIndex(startIndex, indicesMap)
+
+	def compactVoiceSettings(self, isBlocking=True):
+		"""Deletes all invalid voice settings in a single pass, where the voices of the synths which are not known yet are probed only if is blocking is set.
+		Returns the map of old indices to new indices, where each deleted setting maps to the next valid setting, and the set of deleted indices.
+		"""
+		synthsVoices = {}
+		validVoiceSettings = []
+		indicesMap = []
+		deletedIndices = set()
+		for index, voiceSetting in enumerate(self.voiceSettings):
+			synthId = voiceSetting["synthId"]
+
+			# Voices of each synth are resolved only once
+			if not synthId in synthsVoices:
+				synthsVoices[synthId] = self.getVoicesForSynth(synthId, isBlocking)
+			if synthId == SilenceSynthDriver.name or not synthId in self.synthsWithVoices:
+				isValid = synthId in self.synthsWithVoices
+			else:
+				# Settings of the installed synths whose voices could not be read are kept, as the voices may be read next time
+				voices = synthsVoices[synthId]
+				isValid = voices == None or voiceSetting["voiceId"] in voices
+			indicesMap.append(len(validVoiceSettings))
+			if isValid:
+				validVoiceSettings.append(voiceSetting)
+			else:
+				deletedIndices.add(index)
 
-		# If we deleted voice settings at the start index and after it, move index to 0
-		if newValidIndex >= voiceSettingsLength:
-			newValidIndex = 0
-		return newValidIndex
+		# Deleted settings at the end of the list map to the first setting
+		validLength = len(validVoiceSettings)
+		for index in range(len(indicesMap) - 1, -1, -1):
+			if indicesMap[index] < validLength:
+				break
+			indicesMap[index] = 0 if validLength > 0 else -1
+		if len(deletedIndices) > 0:
+			self.voiceSettings[:] = validVoiceSettings
+			self.indexVoiceSettings()
+			self.configStore.markVoiceSettingsListChanged()
+		return indicesMap, deletedIndices
 
-	def findNextInvalid(self, startIndex):
+	def remapVoiceSettingsIndex(self, index, indicesMap):
 		if len(self.voiceSettings) == 0:
 			return -1
 
-		# If start index is out of list bounds, start at zero
-		if startIndex < 0 or startIndex >= len(self.voiceSettings):
-			startIndex = 0
+		# If index is out of list bounds, use zero
+		if index < 0 or index >= len(indicesMap):
+			return 0
+		return indicesMap[index]
 
-		index = startIndex
-		while index >= 0 and self.synthAndVoiceExist(self.voiceSettings[index]):
-			# If list is empty, return not found
-			if len(self.voiceSettings) == 0:
-				return -1
-			index = self.getNextVoiceSettingsIndex(index)
+	def synthAndVoiceExist(self, voiceSetting, isBlocking=True):
+		synthId = voiceSetting["synthId"]
+		if not synthId in self.synthsWithVoices:
+			return False
+		if synthId == SilenceSynthDriver.name:
+			return True
+		voices = self.getVoicesForSynth(synthId, isBlocking)
+		return voices == None or voiceSetting["voiceId"] in voices
 
-			# If we are back on start, we have traversed entire list, so return not found
-			if index == startIndex:
-				return -1
-		return index
+	def updateSynthsWithVoices(self, synthsInfos=None):
+		self.synthListFingerprint = self.getSynthListFingerprint()
+		self.synthsWithVoices = self.createSynthsWithVoices(getSynthList() if synthsInfos == None else synthsInfos)
 
-	def synthAndVoiceExist(self, voiceSetting):
-		synthExists = False
-		voiceExists = False
-		for synthWithVoices in self.synthsWithVoices:
-			synthId = voiceSetting["synthId"]
-			if synthWithVoices["id"] == synthId:
-				synthExists = True
-				if synthId == SilenceSynthDriver.name:
-					voiceExists = True
-					break
-				voices = self.getVoicesForSynth(synthId)
-				if voices == None:
-					return False
-				for voice in voices:
-					if voice["id"] == voiceSetting["voiceId"]:
-						voiceExists = True
-						break
-				else:
-					continue
-				break # Executed only if inner loop broke
-		return synthExists and voiceExists
+	def getSynthListFingerprint(self):
+		# Modification times of the synth drivers directories change whenever drivers are added or removed
+		fingerprint = []
+		for path in synthDrivers.__path__:
+			try:
+				fingerprint.append((path, os.stat(path).st_mtime_ns))
+			except OSError:
+				fingerprint.append((path, None))
+		return fingerprint
 
-	def updateSynthsWithVoices(self):
-		newSynthsWithVoices = []
-		synthsInfos = getSynthList()
+	def invalidateVoiceSettings(self):
+		with self.voiceProbeLock:
+			self.voiceSettingsGeneration += 1
+
+	def isVoiceSettingsValidated(self):
+		"""Checks whether all voice settings have been validated since the synths list, the synths voices or the voice settings changed."""
+		if self.synthListFingerprint != self.getSynthListFingerprint():
+			self.invalidateVoiceSettings()
+		return self.validatedVoiceSettingsGeneration == self.voiceSettingsGeneration
+
+	def createSynthsWithVoices(self, synthsInfos):
+		# Synths are indexed by their IDs, while the dict order keeps the order of the synths list
+		newSynthsWithVoices = {}
 		for synthInfo in synthsInfos:
 			synthId = synthInfo[0]
-			try:
-				# Try finding existing synth with voices dict and appending it
-				existingSynthWithVoices = next(synthWithVoices for synthWithVoices in self.synthsWithVoices if synthWithVoices["id"] == synthId)
-				newSynthsWithVoices.append(existingSynthWithVoices)
-			except StopIteration:
-				# If not already exists, append the new synth with voices dict
+			existingSynthWithVoices = self.synthsWithVoices.get(synthId)
+			if existingSynthWithVoices != None:
+				newSynthsWithVoices[synthId] = existingSynthWithVoices
+			else:
 				isSilence = synthId == SilenceSynthDriver.name
 				synthName = consts.SILENCE_VOICE_NAME if isSilence else synthInfo[1]
-				newSynthsWithVoices.append({
+				newSynthsWithVoices[synthId] = {
 					"id": synthId,
 					"name": synthName,
-					"voices": None
-				})
-		self.synthsWithVoices = newSynthsWithVoices
+					"voices": None,
+				}
+		return newSynthsWithVoices
 
 	def getSynthsWithVoices(self):
-		return self.synthsWithVoices.copy()
+		return list(self.synthsWithVoices.values())
+
+	def getVoicesForSynth(self, synthId, isBlocking=True):
+		synthWithVoices = self.getLoadedSynthWithVoices(synthId, isBlocking)
+		return None if synthWithVoices == None else synthWithVoices["voices"]
 
-	def getVoicesForSynth(self, synthId):
+	def getLoadedSynthWithVoices(self, synthId, isBlocking=True):
 		if synthId == SilenceSynthDriver.name:
 			return None
-		for synthWithVoices in self.synthsWithVoices:
-			if synthWithVoices["id"] == synthId:
-				if synthWithVoices["voices"] == None:
-					synth = getSynth()
-					if synth == None:
-						return None
-					if synth.name== synthId:
-						voices = synth.availableVoices
-						synthWithVoices["voices"] = [{"id": id, "name": voices[id].displayName} for id in voices]
-					else:
-						try:
-							self.preventVoiceSettingsUpdate = True
-							instance = getSynthInstance(synthId)
-							self.preventVoiceSettingsUpdate = False
-							voices = instance.availableVoices
-							synthWithVoices["voices"] = [{"id": id, "name": voices[id].displayName} for id in voices]
-							instance.terminate()
-							del instance
-						except:
-							return None
-				return synthWithVoices["voices"]
-		return None
+		synthWithVoices = self.synthsWithVoices.get(synthId)
+		if synthWithVoices == None:
+			return None
 
-	def getSynthNameById(self, synthId):
-		try:
-			synthName = next(synthWithVoices["name"] for synthWithVoices in self.synthsWithVoices if synthWithVoices["id"] == synthId)
-			return synthName
-		except StopIteration:
+		# The active synth knows its current voices, which may differ from the catalog if voices have been installed or uninstalled system-wide
+		voices = self.getActiveSynthVoices(synthId)
+		if voices != None:
+			self.setSynthVoices(synthWithVoices, voices)
+		elif synthWithVoices["voices"] == None:
+			# Prefer the persistent catalog to avoid instantiating the synth driver
+			voices = self.voiceCatalog.getVoices(synthId)
+			if voices == None:
+				if not isBlocking:
+					return None
+				# Wait for the probe which may already be running in the background
+				try:
+					voices = self.getVoicesProbeFuture(synthId).result()
+				except CancelledError:
+					voices = None
+			if voices == None:
+				return None
+			self.setSynthVoices(synthWithVoices, voices)
+		return synthWithVoices
+
+	def setSynthVoices(self, synthWithVoices, voices):
+		# The voices are replaced as a whole, so that readers in other threads always see a complete list
+		previousVoices = synthWithVoices["voices"]
+		synthWithVoices["voices"] = voices
+		if previousVoices != None and previousVoices != voices:
+			self.invalidateVoiceSettings()
+			# The cache is replaced rather than modified, as voices may be published from the worker threads
+			synthId = synthWithVoices["id"]
+			self.displayNames = {key: displayName for key, displayName in self.displayNames.items() if key[0] != synthId}
+
+	def ensureVoiceKnown(self, synth, voiceId):
+		# Voices installed while NVDA runs are not yet known, so read them again from the synth which uses them
+		synthWithVoices = self.synthsWithVoices.get(synth.name)
+		if synthWithVoices == None or synthWithVoices["voices"] == None or voiceId in synthWithVoices["voices"]:
+			return
+		voices = Voices.fromSynth(synth)
+		self.voiceCatalog.setVoices(synth.name, voices)
+		self.setSynthVoices(synthWithVoices, voices)
+
+	def getActiveSynthVoices(self, synthId):
+		# The voices are read only once from each instance of the active synth, and only on the main thread which owns it
+		synth = getSynth()
+		if synth == None or synth.name != synthId or synth is self.voicesReadSynth or threading.current_thread() is not threading.main_thread():
 			return None
+		voices = Voices.fromSynth(synth)
+		self.voicesReadSynth = synth
+		if self.voiceCatalog.getVoices(synthId) != voices:
+			self.voiceCatalog.setVoices(synthId, voices)
+		return voices
+
+	def refreshActiveSynthVoices(self):
+		synth = getSynth()
+		if synth != None:
+			self.getLoadedSynthWithVoices(synth.name)
+
+	def getSynthDriverLock(self, synthId):
+		with self.voiceProbeLock:
+			if not synthId in self.synthDriverLocks:
+				self.synthDriverLocks[synthId] = threading.RLock()
+			return self.synthDriverLocks[synthId]
+
+	def getVoicesProbeFuture(self, synthId):
+		with self.voiceProbeLock:
+			if self.isTerminated:
+				# No drivers are instantiated while NVDA exits, the voices are just unknown
+				future = Future()
+				future.set_result(None)
+				return future
+			future = self.voiceProbeFutures.get(synthId)
+			if future == None:
+				future = self.voiceProbeExecutor.submit(self.probeVoicesForSynth, synthId)
+				self.voiceProbeFutures[synthId] = future
 
-	def getVoiceNameById(self, synthId, voiceId):
-		voices = self.getVoicesForSynth(synthId)
+				# Finished probes are forgotten, so that failed probes are retried on the next lookup
+				future.add_done_callback(lambda future: self.forgetVoicesProbeFuture(synthId, future))
+			return future
+
+	def forgetVoicesProbeFuture(self, synthId, future):
+		with self.voiceProbeLock:
+			if self.voiceProbeFutures.get(synthId) is future:
+				del self.voiceProbeFutures[synthId]
+
+	def probeVoicesForSynth(self, synthId):
+		# Runs in a worker thread, where the voice settings are never updated by instantiating the synth
+		synth = getSynth()
+		isLoaded = (synth != None and synth.name == synthId) or self.synthPool.peek(synthId) != None
+		if self.voiceEnumerator.isAvailable and not isLoaded:
+			# The driver is instantiated in a separate process outside of the lock, so that a hanging driver does not block switching synths until it is killed
+			self.perfTrace.count("isolatedVoiceProbes")
+			try:
+				voices = self.voiceEnumerator.getVoices(synthId)
+			except VoiceEnumerationError:
+				# The driver which crashed or hung in the separate process would do the same in NVDA, so the synth is skipped and its voices stay unknown
+				return None
+			if voices == None:
+				# Only the drivers which raised an exception, as they need NVDA to be initialized, are instantiated in NVDA instead
+				voices = self.probeVoicesInProcess(synthId)
+		else:
+			voices = self.probeVoicesInProcess(synthId)
 		if voices == None:
 			return None
-		try:
-			voiceName = next(voice["name"] for voice in voices if voice["id"] == voiceId)
-			return voiceName
-		except StopIteration:
-			return None
+		self.voiceCatalog.setVoices(synthId, voices)
+		self.publishVoices(synthId, voices)
+		return voices
 
-	def loadSettingsFromConfig(self):
-		self.voiceSettings = [json.loads(voiceSetting) for voiceSetting in self.getConfig("voiceSettings")]
-		self.profilesVoiceSettingsIndices = json.loads(self.getConfig("profilesVoiceSettingsIndices"))
-		self.otherSettings = {
-			"enableVoiceUpdateWhenNVDAsettingsChange": self.getConfig("enableVoiceUpdateWhenNVDAsettingsChange")
-		}
-		
-		# Create index for naormal profile if not exists
-		voiceSettingsLength = len(self.voiceSettings)
-		if not (consts.NORMAL_PROFILE_NAME in self.profilesVoiceSettingsIndices):
-			if voiceSettingsLength > 0:
-				self.profilesVoiceSettingsIndices[consts.NORMAL_PROFILE_NAME] = 0
+	def probeVoicesInProcess(self, synthId):
+		with self.getSynthDriverLock(synthId):
+			synth = getSynth()
+
+			# The active synth must not be instantiated twice, its voices are read on the main thread only
+			if synth != None and synth.name == synthId:
+				return None
+
+			# Neither the pooled synth must be instantiated twice
+			pooledInstance = self.synthPool.peek(synthId)
+			if pooledInstance != None:
+				return Voices.fromSynth(pooledInstance)
+			self.perfTrace.count("synthInstantiations")
+			try:
+				instance = getSynthInstance(synthId)
+			except:
+				return None
+			try:
+				return Voices.fromSynth(instance)
+			except:
+				return None
+			finally:
+				instance.terminate()
+				del instance
+
+	def publishVoices(self, synthId, voices):
+		synthWithVoices = self.synthsWithVoices.get(synthId)
+		if synthWithVoices != None:
+			self.setSynthVoices(synthWithVoices, voices)
+
+	def warmUpVoices(self):
+		self.voicesWarmUpThread = threading.Thread(target=self.runVoicesWarmUp, name="VoiceToggle voices warm-up", daemon=True)
+		self.voicesWarmUpThread.start()
+
+	def runVoicesWarmUp(self):
+		# Voice lists are published from the catalog when possible, only the missing or stale ones are probed in parallel
+		synthsWithVoices = self.createSynthsWithVoices(getSynthList())
+		futures = []
+		for synthId, synthWithVoices in synthsWithVoices.items():
+			if self.isTerminated:
+				return
+			if synthId == SilenceSynthDriver.name or synthWithVoices["voices"] != None:
+				continue
+			voices = self.voiceCatalog.getVoices(synthId)
+			if voices != None:
+				self.setSynthVoices(synthWithVoices, voices)
 			else:
-				self.profilesVoiceSettingsIndices[consts.NORMAL_PROFILE_NAME] = -1
+				futures.append(self.getVoicesProbeFuture(synthId))
+		self.synthsWithVoices = synthsWithVoices
 
-		if voiceSettingsLength == 0:
-			# Set negative index for all profiles if there are no voice settings
-			for profileName in self.profilesVoiceSettingsIndices:
-				self.profilesVoiceSettingsIndices[profileName] = -1
+		# Voices installed or uninstalled system-wide don't change the fingerprints, so the cached voices are trusted, and refreshed only from the active synth and by ensure voice known
+		wx.CallAfter(self.refreshActiveSynthVoices)
+
+		# The probes may be cancelled if NVDA exits meanwhile
+		wait(futures)
+		self.voiceCatalog.save()
+
+	def getSynthNameById(self, synthId):
+		synthWithVoices = self.synthsWithVoices.get(synthId)
+		return None if synthWithVoices == None else synthWithVoices["name"]
+
+	def getVoiceNameById(self, synthId, voiceId, isBlocking=True):
+		voices = self.getVoicesForSynth(synthId, isBlocking)
+		return None if voices == None else voices.getName(voiceId)
+
+	def getVoiceSettingDisplayName(self, voiceSetting, isBlocking=True):
+		"""Returns the name of the voice setting shown in the voices list of the settings panel, where each name is resolved only once and then cached.
+		If is blocking is not set, None is returned instead of waiting for the voices of the synth to be probed.
+		"""
+		key = (voiceSetting["synthId"], voiceSetting["voiceId"])
+		displayName = self.displayNames.get(key)
+		if displayName != None:
+			return displayName
+		synthName = self.getSynthNameById(key[0])
+		if key[0] == SilenceSynthDriver.name:
+			displayName = consts.SILENCE_VOICE_NAME
 		else:
-			# Set index to 0 if index is out of voice settings bounds for each profile
-			for profileName in self.profilesVoiceSettingsIndices:
-				if self.profilesVoiceSettingsIndices[profileName] < 0 or self.profilesVoiceSettingsIndices[profileName] >= len(self.voiceSettings):
-					self.profilesVoiceSettingsIndices[profileName] = 0
+			voices = self.getVoicesForSynth(key[0], isBlocking)
+			if voices == None and not isBlocking:
+				return None
+			voiceName = None if voices == None else voices.getName(key[1])
+
+			# Names of unknown voices are not cached, so that they are resolved again once the voices are known
+			if voiceName == None:
+				return f"{key[1]} ({synthName})"
+			displayName = f"{voiceName} ({synthName})"
+		self.displayNames[key] = displayName
+		return displayName
+
+	def loadSettingsFromConfig(self):
+		self.ringParamsValues = {}
+		self.voiceSettings, self.profilesVoiceSettingsIds = self.configStore.load()
+		self.otherSettings = {key: self.configStore.loadValue(key) for key in consts.OTHER_SETTINGS}
+		self.indexVoiceSettings()
+		self.replayChangeJournal()
+
+		# Bind the normal profile if not bound, and bind the profiles bound to no longer existing voice settings to the first one
+		firstVoiceSettingId = self.getVoiceSettingId(0)
+		if not (consts.NORMAL_PROFILE_NAME in self.profilesVoiceSettingsIds):
+			self.profilesVoiceSettingsIds[consts.NORMAL_PROFILE_NAME] = firstVoiceSettingId
+		for profileName, voiceSettingId in self.profilesVoiceSettingsIds.items():
+			if not voiceSettingId in self.voiceSettingsPositions:
+				self.profilesVoiceSettingsIds[profileName] = firstVoiceSettingId
+
+	def replayChangeJournal(self):
+		# Changes which NVDA has not saved before it crashed are applied on top of the saved configuration
+		records = self.changeJournal.load()
+		if len(records) == 0:
+			return
+		log.info(f"VoiceToggle: Restoring {len(records)} unsaved changes from the change journal")
+		for record in records:
+			try:
+				self.applyJournalRecord(record)
+			except (IndexError, KeyError, TypeError, ValueError):
+				log.debugWarning(f"VoiceToggle: Skipping invalid journal record {record!r}")
+		self.configStore.markVoiceSettingsListChanged()
+		self.isSettingsDirty = True
+
+	def applyJournalRecord(self, record):
+		op = record[0]
+		if op == "param":
+			voiceSettingId, param, value = record[1:]
+			index = self.voiceSettingsPositions.get(voiceSettingId)
+			if param in consts.TRACKED_PARAMS and index != None:
+				self.voiceSettings[index][param] = value
+		elif op == "voice":
+			voiceSettingId, synthId, voiceId = record[1:]
+			index = self.voiceSettingsPositions.get(voiceSettingId)
+			if index != None:
+				self.voiceSettings[index]["synthId"] = synthId
+				self.voiceSettings[index]["voiceId"] = voiceId
+		elif op == "profileVoice":
+			profileName, voiceSettingId = record[1:]
+			self.profilesVoiceSettingsIds[profileName] = voiceSettingId
+		elif op == "settings":
+			voiceSettings, profilesVoiceSettingsIds = record[1:]
+			self.voiceSettings = [dict(voiceSetting) for voiceSetting in voiceSettings]
+			self.profilesVoiceSettingsIds = dict(profilesVoiceSettingsIds)
+			self.indexVoiceSettings()
+
+	def journalVoiceSettings(self):
+		# Changes of the whole voice settings list are rare, so the whole list is journaled
+		self.changeJournal.append(["settings", self.voiceSettings, self.profilesVoiceSettingsIds])
+
+	def handlePreConfigSave(self):
+		# Deferred changes must be in the configuration before NVDA writes it
+		self.flushSettings()
+
+	def handlePostConfigSave(self):
+		self.changeJournal.clear()
 
 	def saveSettingsTOConfig(self):
-		voiceSettingsJson = [json.dumps(voiceSetting) for voiceSetting in self.voiceSettings]
-		self.setConfig("voiceSettings", voiceSettingsJson)
-		self.setConfig("profilesVoiceSettingsIndices", json.dumps(self.profilesVoiceSettingsIndices))
-		self.setConfig("enableVoiceUpdateWhenNVDAsettingsChange", self.otherSettings["enableVoiceUpdateWhenNVDAsettingsChange"])
+		self.foldRingParamsValues()
+		self.isSettingsDirty = False
+		self.configStore.save(self.voiceSettings, self.profilesVoiceSettingsIds)
+		for key in consts.OTHER_SETTINGS:
+			self.configStore.saveValue(key, self.otherSettings[key])
 
 	def addDefaultVoiceSetting(self):
 		# Create and add the default voice setting if does not exist
@@ -305,28 +752,132 @@ class VoiceToggle:
 			voiceSetting = self.getFreshVoiceSetting()
 			if voiceSetting != None:
 				self.voiceSettings.append(voiceSetting)
+				self.indexVoiceSettings()
+				self.currentVoiceSettingsIndex = 0
+				self.configStore.markVoiceSettingsListChanged()
+				self.journalVoiceSettings()
 
 	def getVoiceSettings(self):
+		self.foldRingParamsValues()
 		return self.voiceSettings.copy()
 
 	def getOtherSettings(self):
 		return self.otherSettings.copy()
 
 	def applyVoiceSettings(self, voiceSettings):
+		self.applyPendingVoice()
+		self.foldRingParamsValues()
+		oldVoiceSettings = self.voiceSettings
 		self.voiceSettings = voiceSettings.copy()
+		self.indexVoiceSettings()
+		self.rebindProfiles(self.getRemovedVoiceSettingsReplacements(oldVoiceSettings))
+		self.configStore.markVoiceSettingsListChanged()
+		self.journalVoiceSettings()
+		self.markSettingsDirty()
 		self.isVoiceSettingsModified = True
+		self.invalidateVoiceSettings()
 		self.changeVoice(self.currentVoiceSettingsIndex, announceChange=False)
 
+	def getRemovedVoiceSettingsReplacements(self, oldVoiceSettings):
+		# Each removed voice setting is replaced by the next one which has not been removed, or by the first one
+		replacementsIds = {}
+		removedIds = []
+		for voiceSetting in oldVoiceSettings:
+			if voiceSetting["id"] in self.voiceSettingsPositions:
+				for voiceSettingId in removedIds:
+					replacementsIds[voiceSettingId] = voiceSetting["id"]
+				removedIds = []
+			else:
+				removedIds.append(voiceSetting["id"])
+		for voiceSettingId in removedIds:
+			replacementsIds[voiceSettingId] = self.getVoiceSettingId(0)
+		return replacementsIds
+
 	def applyOtherSettingsAndSave(self, otherSettings):
+		self.applyPendingVoice()
 		self.otherSettings = otherSettings.copy()
+		self.configureSynthPool()
+		self.voiceEnumerator.enable(self.otherSettings["enableIsolatedVoiceProbe"])
+		self.perfTrace.enable(self.otherSettings["enablePerfTrace"])
+		self.flushSettings()
 		self.saveSettingsTOConfig()
 
+	def getPerfTraceSummary(self):
+		if not self.perfTrace.isEnabled:
+			return None
+		return self.perfTrace.getSummary(self.getSynthPoolStatsLines())
+
+	def dumpPerfTrace(self):
+		self.perfTrace.dumpToLog(self.getSynthPoolStatsLines())
+
+	def getSynthPoolStatsLines(self):
+		if not self.synthPool.isEnabled:
+			return []
+		stats = self.synthPool.getStats()
+		# Translators: Line of the VoiceToggle timings report with the statistics of the kept synthesizers, for example "synth pool: 2 kept, 80 MB, 15 hits, 3 misses, 1 evictions"
+		return [_("synth pool: {size} kept, {memory} MB, {hits} hits, {misses} misses, {evictions} evictions").format(size=stats["size"], memory=stats["memory"] // (1024 * 1024), hits=stats["hits"], misses=stats["misses"], evictions=stats["evictions"])]
+
+	def configureSynthPool(self):
+		self.synthPool.configure(self.otherSettings["enableSynthPool"], self.otherSettings["synthPoolSize"], self.otherSettings["synthPoolMaxMemory"])
+
 	def toggleVoice(self):
 		if len(self.voiceSettings) == 0:
 			return
+		if self.otherSettings["enableRapidCycle"]:
+			self.cycleVoice()
+			return
 		nextIndex = self.getNextVoiceSettingsIndex(self.currentVoiceSettingsIndex)
 		newIndex = self.changeVoice(nextIndex)
 		self.currentVoiceSettingsIndex = newIndex
+		self.markSettingsDirty()
+
+	def cycleVoice(self):
+		# Only the voice to be applied is advanced and announced, the voice itself is applied once the toggling settles
+		index = self.currentVoiceSettingsIndex if self.pendingVoiceSettingsIndex == None else self.pendingVoiceSettingsIndex
+		self.pendingVoiceSettingsIndex = self.getNextVoiceSettingsIndex(index)
+		ui.message(self.getVoiceSettingName(self.voiceSettings[self.pendingVoiceSettingsIndex]))
+		if self.pendingVoiceTimer == None:
+			self.pendingVoiceTimer = wx.CallLater(self.otherSettings["rapidCycleDelay"], self.applyPendingVoice)
+		else:
+			self.pendingVoiceTimer.Start(self.otherSettings["rapidCycleDelay"])
+
+	def getVoiceSettingName(self, voiceSetting):
+		if voiceSetting["synthId"] == SilenceSynthDriver.name:
+			return consts.SILENCE_VOICE_NAME
+
+		# Voices are announced only from the known voices lists, so that a rapid cycling press never waits for a synth driver
+		synthId = voiceSetting["synthId"]
+		voiceName = self.getVoiceNameById(synthId, voiceSetting["voiceId"], isBlocking=False)
+		if voiceName != None:
+			return voiceName
+		if synthId in self.synthsWithVoices and self.synthsWithVoices[synthId]["voices"] == None:
+			# The voices are probed in the background, so that the name is known next time
+			self.getVoicesProbeFuture(synthId)
+		return voiceSetting["voiceId"]
+
+	def cancelPendingVoice(self):
+		if self.pendingVoiceTimer != None:
+			self.pendingVoiceTimer.Stop()
+		self.pendingVoiceSettingsIndex = None
+
+	def commitPendingVoice(self):
+		if self.pendingVoiceSettingsIndex == None:
+			return
+		self.currentVoiceSettingsIndex = self.pendingVoiceSettingsIndex
+		self.cancelPendingVoice()
+		self.markSettingsDirty()
+
+	def applyPendingVoice(self):
+		pendingIndex = self.pendingVoiceSettingsIndex
+		if pendingIndex == None:
+			return
+		self.cancelPendingVoice()
+		newIndex = self.changeVoice(pendingIndex, announceChange=False)
+		self.currentVoiceSettingsIndex = newIndex
+		self.markSettingsDirty()
+		# Announce the voice if the announced one turned out to be invalid and has been replaced
+		if newIndex != pendingIndex and newIndex >= 0:
+			ui.message(self.getVoiceSettingName(self.voiceSettings[newIndex]))
 
 	def getNextVoiceSettingsIndex(self, index):
 		voiceSettingsLength = len(self.voiceSettings)
@@ -340,6 +891,13 @@ class VoiceToggle:
 		return newIndex
 
 	def changeVoice(self, newIndex, announceChange=True):
+		self.foldRingParamsValues()
+		# The voice of the current profile is applied by any voice change
+		self.isProfileVoicePending = False
+		with self.perfTrace.operation("changeVoice"):
+			return self.applyVoice(newIndex, announceChange)
+
+	def applyVoice(self, newIndex, announceChange):
 		voiceSettingsLength = len(self.voiceSettings)
 		if (newIndex >= voiceSettingsLength) or (newIndex < 0):
 			if voiceSettingsLength > 0:
@@ -350,10 +908,16 @@ class VoiceToggle:
 		# Determine the next voice setting
 		newVoiceSetting = self.voiceSettings[newIndex]
 
-		# Delete all invalid voice settings starting from the new index, and update the new index if necessary
-		self.updateSynthsWithVoices()
-		newIndex = self.deleteInvalidVoiceSettings(startIndex=newIndex, dontChangeVoice=True)
-		self.addDefaultVoiceSetting()
+		# Within the same validation generation, only the new voice setting needs to be validated
+		with self.perfTrace.phase("validation"):
+			isValid = self.isVoiceSettingsValidated() and self.synthAndVoiceExist(newVoiceSetting)
+		if not isValid:
+			# Delete all invalid voice settings starting from the new index, and update the new index if necessary
+			with self.perfTrace.phase("synthListRefresh"):
+				self.updateSynthsWithVoices()
+			with self.perfTrace.phase("validation"):
+				newIndex = self.deleteInvalidVoiceSettings(startIndex=newIndex, dontChangeVoice=True)
+				self.addDefaultVoiceSetting()
 		voiceSettingsLength = len(self.voiceSettings)
 		if voiceSettingsLength == 0:
 			# If after deleting all invalid voice settings there were no voice settings and we did not add a default one, return -1
@@ -367,34 +931,162 @@ class VoiceToggle:
 
 		# Only apply new synth if voice settings have been modified in add-on settings or changed due to invalidation, or if changed from previous one
 		if self.isVoiceSettingsModified or synth == None or newVoiceSetting["synthId"] != synth.name:
-			if newVoiceSetting["synthId"] == SilenceSynthDriver.name:
-				if synth != None:
-					setSynth(None)
-			else:
-				self.preventVoiceSettingsUpdate = True
-				setSynth(newVoiceSetting["synthId"])
-				self.preventVoiceSettingsUpdate = False
-				synth = getSynth()
-		
-		# Apply new voice setting
+			with self.perfTrace.phase("setSynth"):
+				if newVoiceSetting["synthId"] == SilenceSynthDriver.name:
+					self.switchSynth(None)
+				elif not self.switchSynth(newVoiceSetting["synthId"], onSwitched=lambda: self.applyVoiceSettingValues(newVoiceSetting, announceChange)):
+					# The voice is applied once the synth has been loaded in the background
+					self.appliedVoiceFingerprint = None
+					return newIndex
+		else:
+			# The voice of the active synth supersedes the switch to another synth still loading in the background
+			self.synthSwitcher.cancel()
+		self.applyVoiceSettingValues(newVoiceSetting, announceChange)
+		return newIndex
+
+	def applyVoiceSettingValues(self, newVoiceSetting, announceChange):
+		synth = getSynth()
+
+		# Apply new voice setting, where only the values differing from the live synth are assigned, as each assignment may reconfigure the driver
 		if newVoiceSetting["synthId"] != SilenceSynthDriver.name:
-			synth.voice = newVoiceSetting["voiceId"]
+			self.applyVoiceSettingValue(synth, "voice", newVoiceSetting["voiceId"])
+			# Params are compared only after the voice is set, as changing the voice may change them
 			for param in consts.SAVED_PARAMS:
 				if param in newVoiceSetting:
-					setattr(synth, param, newVoiceSetting[param])
+					self.applyVoiceSettingValue(synth, param, newVoiceSetting[param])
 			if synth != None:
-				synth.saveSettings()
+				# Saving the synth settings is deferred, so that toggling repeatedly saves them only once
+				self.markSynthSettingsDirty(newVoiceSetting)
 		if announceChange and newVoiceSetting["synthId"] != SilenceSynthDriver.name:
-			voiceName = self.getVoiceNameById(newVoiceSetting["synthId"], newVoiceSetting["voiceId"])
-			ui.message(voiceName)
+			with self.perfTrace.phase("message"):
+				voiceName = self.getVoiceNameById(newVoiceSetting["synthId"], newVoiceSetting["voiceId"])
+				ui.message(voiceName)
 		self.isVoiceSettingsModified = False
-		return newIndex
+		self.appliedSynth = synth
+		self.appliedVoiceFingerprint = getVoiceSettingFingerprint(newVoiceSetting)
+
+	def applyVoiceSettingValue(self, synth, name, value):
+		if getattr(synth, name, None) == value:
+			self.perfTrace.count(f"skipped {name}")
+			return
+		with self.perfTrace.phase(name):
+			setattr(synth, name, value)
+
+	def switchSynth(self, synthId, onSwitched=None):
+		"""Makes the given synth the active one, where None means silence.
+		If on switched is given and the synth driver needs to be loaded, the driver is loaded in the background, False is returned and on switched is called once the synth is active.
+		"""
+		synth = getSynth()
+		currentSynthId = None if synth == None else synth.name
+		if onSwitched != None and self.otherSettings["enableAsyncSynthSwitch"] and synthId in consts.BACKGROUND_LOADABLE_SYNTHS and synthId != currentSynthId and self.synthPool.peek(synthId) == None:
+			self.perfTrace.count("asyncSynthSwitches")
+			self.synthSwitcher.submit(synthId, lambda instance: self.finishSynthSwitch(synthId, instance, onSwitched))
+			return False
+		self.synthSwitcher.cancel()
+
+		# Settings of the synth which is being replaced must be saved while it is still active
+		self.flushSynthSettings()
+		if synthId == None:
+			if self.synthPool.isEnabled:
+				self.swapSynth(None)
+			elif synth != None:
+				setSynth(None)
+			return True
+		with self.getSynthDriverLock(synthId):
+			self.preventVoiceSettingsUpdate = True
+			try:
+				# Swapping is only possible between different synths, otherwise the synth is reinitialized
+				if self.synthPool.isEnabled and synthId != currentSynthId:
+					self.swapSynth(synthId)
+				else:
+					self.synthPool.discard(synthId)
+					self.perfTrace.count("synthInstantiations")
+					setSynth(synthId)
+			finally:
+				self.preventVoiceSettingsUpdate = False
+		return True
+
+	def loadSynth(self, synthId):
+		# Runs in the worker thread of the synth switcher, where the voice settings are never updated by instantiating the synth
+		with self.getSynthDriverLock(synthId):
+			memoryBefore = getProcessMemory()
+			self.perfTrace.count("synthInstantiations")
+			instance = getSynthInstance(synthId)
+			self.synthPool.setMemoryEstimate(synthId, max(0, getProcessMemory() - memoryBefore))
+			return instance
+
+	def discardLoadedSynth(self, instance):
+		# The instance loaded for a superseded switch is kept in the pool if enabled, so that the loading is not wasted
+		self.perfTrace.count("cancelledSynthSwitches")
+		synth = getSynth()
+		if synth != None and synth.name == instance.name:
+			self.synthPool.terminateInstance(instance)
+		else:
+			self.synthPool.put(instance)
+
+	def finishSynthSwitch(self, synthId, instance, onSwitched):
+		with self.perfTrace.operation("synthSwitch"):
+			if instance == None:
+				# Switching the usual way lets NVDA fall back to another synth
+				self.switchSynth(synthId)
+			else:
+				# Settings of the synth which is being replaced must be saved while it is still active
+				self.flushSynthSettings()
+				self.preventVoiceSettingsUpdate = True
+				try:
+					# The instance has been loaded without the settings ring and the voice dictionary, which changeVoice sets up here on the main thread
+					self.activateSynth(instance)
+				finally:
+					self.preventVoiceSettingsUpdate = False
+			onSwitched()
+
+	def swapSynth(self, synthId):
+		"""Makes the pooled or newly instantiated synth the active one, while keeping the previously active synth in the pool."""
+		instance = None
+		if synthId != None:
+			instance = self.synthPool.take(synthId)
+			if instance == None:
+				memoryBefore = getProcessMemory()
+				self.perfTrace.count("synthInstantiations")
+				try:
+					instance = getSynthInstance(synthId)
+				except:
+					log.error(f"VoiceToggle: Unable to instantiate synth {synthId}", exc_info=True)
+					setSynth(synthId)
+					return
+				self.synthPool.setMemoryEstimate(synthId, max(0, getProcessMemory() - memoryBefore))
+		self.activateSynth(instance)
+
+	def activateSynth(self, instance):
+		# The previously active synth is kept in the pool, or terminated if the pool is disabled
+		synth = getSynth()
+		if synth != None:
+			synth.cancel()
+			self.synthPool.put(synth)
+		synthDriverHandler._curSynth = instance
+		if instance == None:
+			return
+		config.conf["speech"]["synth"] = instance.name
+
+		# Like setSynth, the settings ring and the voice dictionary are set up for the activated synth, without updating the voice settings
+		isVoiceSettingsUpdatePrevented = self.preventVoiceSettingsUpdate
+		self.preventVoiceSettingsUpdate = True
+		try:
+			synthDriverHandler.changeVoice(instance, instance.voice)
+		finally:
+			self.preventVoiceSettingsUpdate = isVoiceSettingsUpdatePrevented
+		synthChanged = getattr(synthDriverHandler, "synthChanged", None)
+		if synthChanged != None:
+			synthChanged.notify(synth=instance, audioOutputDevice=getattr(synthDriverHandler, "_audioOutputDevice", None), isFallback=False)
 
 	def updateVoiceSettingParam(self, param, value):
 		if self.currentVoiceSettingsIndex < 0 or len(self.voiceSettings) <= self.currentVoiceSettingsIndex:
 			return None
 		currentVoiceSetting = self.voiceSettings[self.currentVoiceSettingsIndex]
 		currentVoiceSetting[param] = value
+		self.configStore.markVoiceSettingChanged(self.currentVoiceSettingsIndex)
+		self.changeJournal.append(["param", currentVoiceSetting["id"], param, value])
+		self.markSettingsDirty()
 
 	def updateVoiceSettingSynthAndVoice(self, synthId, voiceId):
 		if self.currentVoiceSettingsIndex < 0 or len(self.voiceSettings) <= self.currentVoiceSettingsIndex:
@@ -402,6 +1094,9 @@ class VoiceToggle:
 		currentVoiceSetting = self.voiceSettings[self.currentVoiceSettingsIndex]
 		currentVoiceSetting["synthId"] = synthId
 		currentVoiceSetting["voiceId"] = voiceId
+		self.configStore.markVoiceSettingChanged(self.currentVoiceSettingsIndex)
+		self.changeJournal.append(["voice", currentVoiceSetting["id"], synthId, voiceId])
+		self.markSettingsDirty()
 
 	def getFreshVoiceSetting(self):
 		synth = getSynth()
@@ -420,11 +1115,87 @@ class VoiceToggle:
 				voiceSetting[param] = getattr(synth, param)
 		return voiceSetting
 
+	def markSynthSettingsDirty(self, voiceSetting):
+		# The profile which the synth saves its settings to is remembered, as it may be switched before the settings are saved
+		self.isSynthSettingsDirty = True
+		self.synthSettingsProfile = config.conf.profiles[-1]
+		self.dirtySynthVoiceSetting = voiceSetting
+		self.scheduleFlush()
+
+	def markSettingsDirty(self):
+		self.isSettingsDirty = True
+		self.scheduleFlush()
+
+	def scheduleFlush(self):
+		# The timer is restarted by each change, so that the settings are saved only once the changes settle
+		if self.flushTimer == None:
+			self.flushTimer = wx.CallLater(consts.SETTINGS_FLUSH_DELAY, self.flushSettings)
+		else:
+			self.flushTimer.Start(consts.SETTINGS_FLUSH_DELAY)
+
+	def flushSynthSettings(self):
+		if not self.isSynthSettingsDirty:
+			return
+		self.isSynthSettingsDirty = False
+		synth = getSynth()
+		if synth != None:
+			with self.perfTrace.phase("saveSettings"):
+				synth.saveSettings()
+
+	def flushSynthSettingsToProfile(self):
+		"""Writes the deferred synth settings into the profile which was active when they were applied, without touching the synth, whose settings are already those of another profile."""
+		if not self.isSynthSettingsDirty:
+			return
+		self.isSynthSettingsDirty = False
+		voiceSetting = self.dirtySynthVoiceSetting
+		profile = self.synthSettingsProfile
+		with self.perfTrace.phase("saveSettings"):
+			synthConfig = profile.setdefault("speech", {}).setdefault(voiceSetting["synthId"], {})
+			synthConfig["voice"] = voiceSetting["voiceId"]
+			for param in consts.SAVED_PARAMS:
+				if param in voiceSetting:
+					synthConfig[param] = voiceSetting[param]
+		# NVDA writes only the profiles marked as dirty, while the normal configuration is always written
+		dirtyProfiles = getattr(config.conf, "_dirtyProfiles", None)
+		if getattr(profile, "name", None) != None and dirtyProfiles != None:
+			dirtyProfiles.add(profile.name)
+
+	def flushSettings(self):
+		"""Immediately saves the synth settings and VoiceToggle settings whose saving has been deferred."""
+		if self.flushTimer != None:
+			self.flushTimer.Stop()
+		self.flushSynthSettings()
+		if self.isSettingsDirty:
+			self.saveSettingsTOConfig()
+
 	def getConfig(self, key):
 		return config.conf["VoiceToggle"][key]
 
 	def setConfig(self, key, value):
+		self.perfTrace.count("configWrites")
 		config.conf["VoiceToggle"][key] = value
 
+	def shutDownVoiceProbes(self):
+		with self.voiceProbeLock:
+			self.isTerminated = True
+
+			# Queued probes must not instantiate drivers while NVDA exits, only the running ones are left to finish
+			for future in list(self.voiceProbeFutures.values()):
+				future.cancel()
+			if sys.version_info >= (3, 9):
+				self.voiceProbeExecutor.shutdown(wait=False, cancel_futures=True)
+			else:
+				self.voiceProbeExecutor.shutdown(wait=False)
+
 	def terminate(self):
+		# The announced voice is saved even if it has not been applied yet, as the user expects it when NVDA starts again
+		self.commitPendingVoice()
+		if self.profileVoiceTimer != None:
+			self.profileVoiceTimer.Stop()
+		self.flushSettings()
 		self.saveSettingsTOConfig()
+		self.synthSwitcher.terminate()
+		self.synthPool.terminate()
+		self.shutDownVoiceProbes()
+		self.voiceCatalog.terminate()
+		self.changeJournal.terminate()
@@ -0,0 +1,78 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Compares the memory used by the voices of synths in the previous layout, a list of dicts with a dict of the voices names, with the compact interned layout.
+
+The voices are decoded from the catalog JSON in both layouts, like when they are read after an NVDA restart, and the memory retained by the decoded voices is measured using tracemalloc.
+
+Usage: python benchmarks/catalogMemory.py [--voices 10000] [--synths 3]
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+
+import harness
+
+from globalPlugins.voiceToggle.voiceCatalog import Voices
+
+LANGUAGES = ["en_US", "en_GB", "fr_FR", "de_DE", "cs_CZ", "es_ES", "pt_BR", "zh_CN", "ja_JP", "ar_SA"]
+
+def createCatalogsJson(synthsCount, voicesCount):
+	# Each synth has voices with IDs like the OneCore voice tokens, and with a few distinct languages
+	catalogs = []
+	for synthIndex in range(synthsCount):
+		ids = [f"HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech_OneCore\\Voices\\Tokens\\synth{synthIndex}voice{index}" for index in range(voicesCount)]
+		names = [f"Synth {synthIndex} voice {index}" for index in range(voicesCount)]
+		languages = [LANGUAGES[index % len(LANGUAGES)] for index in range(voicesCount)]
+		catalogs.append({
+			"dicts": json.dumps([{"id": voiceId, "name": name, "language": language} for voiceId, name, language in zip(ids, names, languages)]),
+			"compact": json.dumps(Voices(ids, names, languages).toData()),
+		})
+	return catalogs
+
+def loadDictsLayout(catalogJson):
+	voices = json.loads(catalogJson)
+	return voices, {voice["id"]: voice["name"] for voice in voices}
+
+def loadCompactLayout(catalogJson):
+	return Voices.fromData(json.loads(catalogJson))
+
+def measureRetainedMemory(load, catalogsJson):
+	tracemalloc.start()
+	try:
+		before = tracemalloc.take_snapshot()
+		loaded = [load(catalogJson) for catalogJson in catalogsJson]
+		after = tracemalloc.take_snapshot()
+	finally:
+		tracemalloc.stop()
+	retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+	del loaded
+	return retained
+
+def main():
+	parser = argparse.ArgumentParser(description="Compares the memory used by the voices lists in the previous and compact layouts.")
+	parser.add_argument("--voices", type=int, default=10000, help="number of voices of each synth")
+	parser.add_argument("--synths", type=int, default=3, help="number of synths whose voices are held in memory")
+	args = parser.parse_args()
+
+	catalogs = createCatalogsJson(args.synths, args.voices)
+	dictsMemory = measureRetainedMemory(loadDictsLayout, [catalog["dicts"] for catalog in catalogs])
+	compactMemory = measureRetainedMemory(loadCompactLayout, [catalog["compact"] for catalog in catalogs])
+	voicesCount = args.synths * args.voices
+	print(f"{args.synths} synths with {args.voices} voices each: dicts layout {dictsMemory / 1024:.0f} KiB, compact layout {compactMemory / 1024:.0f} KiB ({compactMemory / dictsMemory:.2f}x)", file=sys.stderr)
+	json.dump({
+		"parameters": {
+			"voices": args.voices,
+			"synths": args.synths,
+		},
+		"dictsLayoutBytes": dictsMemory,
+		"compactLayoutBytes": compactMemory,
+		"dictsLayoutBytesPerVoice": dictsMemory / voicesCount,
+		"compactLayoutBytesPerVoice": compactMemory / voicesCount,
+	}, sys.stdout, indent="\t")
+	print()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,152 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Sets up the NVDA stand-ins, fake synth drivers and VoiceToggle instances for the benchmarks."""
+
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path[:0] = [os.path.join(BENCHMARKS_DIR, "nvdaStubs"), os.path.join(REPO_DIR, "addon"), REPO_DIR]
+
+import addonHandler
+import config
+import globalVars
+import synthDriverHandler
+import synthSettingsRing
+import ui
+import wx
+
+import globalPlugins.voiceToggle.consts as consts
+from globalPlugins.voiceToggle.voiceToggle import VoiceToggle
+
+def getSynthId(index):
+	return f"synth{index}"
+
+def getPercentile(sortedValues, percent):
+	if len(sortedValues) == 0:
+		return 0
+	rank = max(1, round(percent / 100 * len(sortedValues)))
+	return sortedValues[min(rank, len(sortedValues)) - 1]
+
+class Environment:
+	"""Fake NVDA environment with the given number of synths, each having the given number of voices and instantiation delay in seconds."""
+
+	def __init__(self, synthsCount, voicesPerSynth=20, initDelay=0.0):
+		self.synthsCount = synthsCount
+		self.voicesPerSynth = voicesPerSynth
+		self.initDelay = initDelay
+		self.app = None
+		self.configPath = None
+
+	def reset(self):
+		config.reset()
+		config.conf.spec["VoiceToggle"] = consts.CONFIG_SPEC
+		synthDriverHandler.reset()
+		synthSettingsRing.reset()
+		ui.messages.clear()
+		wx.clearPending()
+		if self.configPath != None:
+			shutil.rmtree(self.configPath, ignore_errors=True)
+		self.configPath = tempfile.mkdtemp(prefix="voiceToggleBenchmark")
+		globalVars.appArgs.configPath = self.configPath
+		for index in range(self.synthsCount):
+			synthDriverHandler.registerDriver(getSynthId(index), voiceCount=self.voicesPerSynth, initDelay=self.initDelay)
+		synthDriverHandler.setSynth(getSynthId(0))
+
+	def createVoiceSettings(self, count, invalidEvery=0):
+		# Settings are spread over all synths, so that consecutive settings use different synths
+		voiceSettings = []
+		for index in range(count):
+			if invalidEvery > 0 and index % invalidEvery == invalidEvery - 1:
+				voiceSettings.append({"synthId": "removedSynth", "voiceId": "v0"})
+				continue
+			voiceSettings.append({
+				"synthId": getSynthId(index % self.synthsCount),
+				"voiceId": f"v{(index // self.synthsCount) % self.voicesPerSynth}",
+				"rate": 30 + index % 40,
+			})
+		return voiceSettings
+
+	def createApp(self, voiceSettingsCount):
+		"""Creates VoiceToggle with the given number of voice settings saved in the configuration and waits until it is ready."""
+		self.close()
+		self.reset()
+		app = VoiceToggle()
+		self.waitForBackgroundWork(app)
+		config.pre_configSave.register(app.handlePreConfigSave)
+		config.post_configSave.register(app.handlePostConfigSave)
+		app.applyVoiceSettings(self.createVoiceSettings(voiceSettingsCount))
+		self.waitForSynthSwitch(app)
+		config.conf.save()
+		wx.runPending()
+		synthDriverHandler.resetStats()
+		self.app = app
+		return app
+
+	def removeMonkeyPatches(self):
+		synthDriverHandler.__dict__.update(synthDriverHandler.originalFunctions)
+		synthSettingsRing.reset()
+
+	def waitForBackgroundWork(self, app):
+		app.voicesWarmUpThread.join()
+		wx.runPending()
+
+	def waitForSynthSwitch(self, app):
+		# Synth drivers are loaded in the background, and the loaded synth is activated once the calls after are pumped
+		app.synthSwitcher.wait()
+		wx.runPending(advanceTimers=False)
+
+	@contextlib.contextmanager
+	def backgroundLoading(self, app):
+		"""Loads the fake synth drivers in the background while toggling, as if they were among the synths which may be loaded in the background."""
+		backgroundLoadableSynths = consts.BACKGROUND_LOADABLE_SYNTHS
+		isAsyncSynthSwitchEnabled = app.otherSettings["enableAsyncSynthSwitch"]
+		consts.BACKGROUND_LOADABLE_SYNTHS = backgroundLoadableSynths | {getSynthId(index) for index in range(self.synthsCount)}
+		app.otherSettings["enableAsyncSynthSwitch"] = True
+		try:
+			yield
+		finally:
+			self.waitForSynthSwitch(app)
+			consts.BACKGROUND_LOADABLE_SYNTHS = backgroundLoadableSynths
+			app.otherSettings["enableAsyncSynthSwitch"] = isAsyncSynthSwitchEnabled
+
+	def close(self):
+		if self.app != None:
+			self.app.terminate()
+			wx.runPending()
+			self.app = None
+		if self.configPath != None:
+			shutil.rmtree(self.configPath, ignore_errors=True)
+			self.configPath = None
+
+def measure(func, iterations, setUp=None):
+	"""Runs the function the given number of times and returns the timings in milliseconds together with the driver and config counters."""
+	durations = []
+	synthDriverHandler.resetStats()
+	writesCount = config.conf.writesCount
+	for iteration in range(iterations):
+		if setUp != None:
+			setUp()
+		start = time.perf_counter()
+		func()
+		durations.append((time.perf_counter() - start) * 1000)
+	durations.sort()
+	return {
+		"iterations": iterations,
+		"meanMs": sum(durations) / len(durations),
+		"medianMs": getPercentile(durations, 50),
+		"p95Ms": getPercentile(durations, 95),
+		"minMs": durations[0],
+		"maxMs": durations[-1],
+		"synthInstantiations": synthDriverHandler.stats["instantiations"],
+		"voiceAssignments": synthDriverHandler.stats["voiceAssignments"],
+		"paramAssignments": synthDriverHandler.stats["paramAssignments"],
+		"synthSaveSettings": synthDriverHandler.stats["saveSettings"],
+		"configWrites": config.conf.writesCount - writesCount,
+	}
@@ -0,0 +1,11 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's api module, capturing the clipboard text."""
+
+clipboard = None
+
+def copyToClip(text, notify=False):
+	global clipboard
+	clipboard = text
+	return True
@@ -0,0 +1,82 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's config module with an in-memory configuration and profile switching."""
+
+import extensionPoints
+
+class Profile(dict):
+
+	def __init__(self, name=None):
+		super().__init__()
+		self.name = name
+
+def getDefault(spec):
+	# Parses the default value from a configobj validator spec like "integer(default=2, min=1)"
+	if spec == None:
+		raise KeyError("Not in the configuration spec")
+	if spec.startswith("string_list"):
+		return []
+	if spec.startswith("boolean"):
+		return "default=True" in spec
+	raw = spec[spec.index("default=") + len("default="):spec.rindex(")")]
+	if spec.startswith("integer"):
+		return int(raw.split(",")[0])
+	return raw.strip("'\"")
+
+class Section(dict):
+
+	def __init__(self, conf, name):
+		super().__init__()
+		self.conf = conf
+		self.name = name
+
+	def __getitem__(self, key):
+		if not key in self:
+			return getDefault(self.conf.spec.get(self.name, {}).get(key))
+		return dict.__getitem__(self, key)
+
+	def __setitem__(self, key, value):
+		self.conf.writesCount += 1
+		dict.__setitem__(self, key, value)
+
+class Conf:
+
+	def __init__(self):
+		self.spec = {}
+		self.sections = {}
+		self.profiles = [Profile()]
+		self.writesCount = 0
+		self.savesCount = 0
+		self["speech"]["synth"] = "espeak"
+
+	def __getitem__(self, key):
+		if not key in self.sections:
+			self.sections[key] = Section(self, key)
+		return self.sections[key]
+
+	def save(self):
+		pre_configSave.notify()
+		self.savesCount += 1
+		post_configSave.notify()
+
+conf = Conf()
+post_configProfileSwitch = extensionPoints.Action()
+pre_configSave = extensionPoints.Action()
+post_configSave = extensionPoints.Action()
+
+def setActiveProfile(name):
+	"""Makes the given profile, or the normal configuration if None, the active one without notifying about the switch."""
+	conf.profiles = [Profile()] if name == None else [Profile(), Profile(name)]
+
+def switchProfile(name):
+	setActiveProfile(name)
+	post_configProfileSwitch.notify()
+
+def reset():
+	"""Replaces the configuration with a fresh one and unregisters all profile switch and configuration save handlers."""
+	global conf
+	conf = Conf()
+	post_configProfileSwitch.handlers.clear()
+	pre_configSave.handlers.clear()
+	post_configSave.handlers.clear()
@@ -0,0 +1,6 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's gui package, enough to import the settings dialogs."""
+
+from . import guiHelper, nvdaControls, settingsDialogs
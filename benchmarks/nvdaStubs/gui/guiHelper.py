@@ -0,0 +1,14 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's gui.guiHelper module."""
+
+class BoxSizerHelper:
+
+	def __init__(self, *args, **kwargs):
+		pass
+
+class ButtonHelper:
+
+	def __init__(self, *args, **kwargs):
+		pass
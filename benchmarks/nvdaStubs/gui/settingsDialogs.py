@@ -0,0 +1,12 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's gui.settingsDialogs module."""
+
+import wx
+
+class SettingsPanel(wx.Window):
+	pass
+
+class NVDASettingsDialog:
+	categoryClasses = []
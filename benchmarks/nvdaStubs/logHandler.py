@@ -0,0 +1,16 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's logHandler module."""
+
+import logging
+
+class Logger(logging.Logger):
+
+	def debugWarning(self, msg, *args, **kwargs):
+		self.debug(msg, *args, **kwargs)
+
+	def io(self, msg, *args, **kwargs):
+		self.debug(msg, *args, **kwargs)
+
+log = Logger("nvda")
@@ -0,0 +1,15 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's scriptHandler module."""
+
+lastScriptRepeatCount = 0
+
+def script(**kwargs):
+	def decorator(func):
+		func.__dict__.update(kwargs)
+		return func
+	return decorator
+
+def getLastScriptRepeatCount():
+	return lastScriptRepeatCount
@@ -0,0 +1,135 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's synthDriverHandler with fake synth drivers of configurable instantiation delay and voice counts."""
+
+import time
+
+import config
+import extensionPoints
+
+class VoiceInfo:
+
+	def __init__(self, id, displayName, language=None):
+		self.id = id
+		self.displayName = displayName
+		self.language = language
+
+class FakeSynthDriver:
+	name = None
+	description = None
+	voiceCount = 0
+	initDelay = 0.0
+
+	def __init__(self):
+		time.sleep(self.initDelay)
+		stats["instantiations"] += 1
+		self._voice = "v0" if self.voiceCount > 0 else None
+		self.volume = 100
+		self.rate = 50
+		self.pitch = 50
+
+		# Like NVDA drivers loading their settings, the voice is set through the module level changeVoice function
+		changeVoice(self, self._voice)
+		self.writeConfig()
+
+	def writeConfig(self):
+		# Like NVDA, the settings of each synth are kept in the speech section, but writing them is not counted as a VoiceToggle config write
+		dict.__setitem__(config.conf["speech"], self.name, {
+			"voice": self._voice,
+			"volume": self.volume,
+			"rate": self.rate,
+			"pitch": self.pitch,
+		})
+
+	@property
+	def availableVoices(self):
+		return {f"v{i}": VoiceInfo(f"v{i}", f"{self.name} voice {i}", "en") for i in range(self.voiceCount)}
+
+	@property
+	def voice(self):
+		return self._voice
+
+	@voice.setter
+	def voice(self, value):
+		stats["voiceAssignments"] += 1
+		self._voice = value
+
+	def __setattr__(self, name, value):
+		if name in ("volume", "rate", "pitch") and name in self.__dict__:
+			stats["paramAssignments"] += 1
+		super().__setattr__(name, value)
+
+	def saveSettings(self):
+		stats["saveSettings"] += 1
+		self.writeConfig()
+
+	def cancel(self):
+		pass
+
+	def terminate(self):
+		stats["terminations"] += 1
+
+drivers = {}
+stats = {}
+_curSynth = None
+_audioOutputDevice = "default"
+synthChanged = extensionPoints.Action()
+
+def resetStats():
+	for key in ["instantiations", "terminations", "voiceAssignments", "paramAssignments", "saveSettings", "synthListCalls"]:
+		stats[key] = 0
+
+resetStats()
+
+def registerDriver(name, voiceCount=3, initDelay=0.0):
+	"""Registers a fake synth driver with the given number of voices, whose instantiation takes the given number of seconds."""
+	drivers[name] = type(name, (FakeSynthDriver,), {
+		"name": name,
+		"description": f"Fake {name}",
+		"voiceCount": voiceCount,
+		"initDelay": initDelay,
+	})
+
+def changeVoice(synth, voice):
+	pass
+
+def getSynthList():
+	stats["synthListCalls"] += 1
+	return [(name, driver.description) for name, driver in drivers.items()] + [("silence", "No speech")]
+
+def getSynthInstance(name, asDefault=False):
+	if not name in drivers:
+		raise LookupError(f"No such synth driver: {name}")
+	return drivers[name]()
+
+def getSynth():
+	return _curSynth
+
+def setSynth(name, isFallback=False):
+	global _curSynth
+	if _curSynth != None:
+		_curSynth.cancel()
+		_curSynth.terminate()
+		_curSynth = None
+	if name == None:
+		return True
+	_curSynth = getSynthInstance(name)
+	if not isFallback:
+		config.conf["speech"]["synth"] = name
+	synthChanged.notify(synth=_curSynth, audioOutputDevice=_audioOutputDevice, isFallback=isFallback)
+	return True
+
+originalFunctions = {
+	"changeVoice": changeVoice,
+	"setSynth": setSynth,
+}
+
+def reset():
+	"""Removes all drivers and monkey patches, and unloads the active synth."""
+	global _curSynth
+	globals().update(originalFunctions)
+	drivers.clear()
+	synthChanged.handlers.clear()
+	_curSynth = None
+	resetStats()
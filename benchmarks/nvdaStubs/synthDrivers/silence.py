@@ -0,0 +1,8 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's silence synth driver."""
+
+class SynthDriver:
+	name = "silence"
+	description = "No speech"
@@ -0,0 +1,44 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in for NVDA's synthSettingsRing module."""
+
+import synthDriverHandler
+
+class SynthSettingsRing:
+
+	def __init__(self, settingName="rate"):
+		self.currentSettingName = settingName.capitalize()
+
+	def change(self, delta):
+		synth = synthDriverHandler.getSynth()
+		param = self.currentSettingName.lower()
+		value = max(0, min(100, getattr(synth, param) + delta))
+		setattr(synth, param, value)
+		return value
+
+	def first(self):
+		return self.change(-100)
+
+	def last(self):
+		return self.change(100)
+
+	def increase(self):
+		return self.change(1)
+
+	def increaseLarge(self):
+		return self.change(10)
+
+	def decrease(self):
+		return self.change(-1)
+
+	def decreaseLarge(self):
+		return self.change(-10)
+
+METHODS_NAMES = ["first", "last", "increase", "increaseLarge", "decrease", "decreaseLarge"]
+originalMethods = {methodName: getattr(SynthSettingsRing, methodName) for methodName in METHODS_NAMES}
+
+def reset():
+	"""Removes all monkey patches."""
+	for methodName, method in originalMethods.items():
+		setattr(SynthSettingsRing, methodName, method)
@@ -0,0 +1,96 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Minimal stand-in for wxPython, where timers and calls after run when the event queue is pumped."""
+
+import threading
+import time
+
+EVT_WINDOW_DESTROY = EVT_BUTTON = EVT_CHOICE = EVT_CHECKBOX = EVT_CHAR_HOOK = EVT_TEXT = EVT_LISTBOX = object()
+VERTICAL = HORIZONTAL = ALL = EXPAND = 0
+WXK_ESCAPE = 27
+LC_REPORT = LC_VIRTUAL = LC_SINGLE_SEL = LC_NO_HEADER = 0
+LIST_STATE_SELECTED = LIST_STATE_FOCUSED = 0
+
+pending = []
+pendingLock = threading.Lock()
+
+def CallAfter(func, *args, **kwargs):
+	with pendingLock:
+		pending.append((None, func, args, kwargs))
+
+class CallLater:
+
+	def __init__(self, millis, func, *args, **kwargs):
+		self.func = func
+		self.args = args
+		self.kwargs = kwargs
+		self.running = False
+		self.Start(millis)
+
+	def Start(self, millis=None, *args, **kwargs):
+		if millis != None:
+			self.millis = millis
+		if len(args) > 0 or len(kwargs) > 0:
+			self.args = args
+			self.kwargs = kwargs
+		self.due = time.monotonic() + self.millis / 1000
+		if not self.running:
+			self.running = True
+			with pendingLock:
+				pending.append((self, None, None, None))
+
+	def Restart(self, millis=None, *args, **kwargs):
+		self.Start(millis, *args, **kwargs)
+
+	def Stop(self):
+		self.running = False
+		with pendingLock:
+			pending[:] = [item for item in pending if item[0] is not self]
+
+	def IsRunning(self):
+		return self.running
+
+def runPending(advanceTimers=True):
+	"""Runs all pending calls after and timers, where timers fire immediately if advance timers is set, otherwise only when due."""
+	while True:
+		with pendingLock:
+			if len(pending) == 0:
+				return
+			timer, func, args, kwargs = pending.pop(0)
+		if timer == None:
+			func(*args, **kwargs)
+			continue
+		if not timer.running:
+			continue
+		if not advanceTimers and time.monotonic() < timer.due:
+			with pendingLock:
+				pending.append((timer, None, None, None))
+			if all(item[0] != None and time.monotonic() < item[0].due for item in pending):
+				return
+			continue
+		timer.running = False
+		timer.func(*timer.args, **timer.kwargs)
+
+def clearPending():
+	with pendingLock:
+		pending.clear()
+
+class Window:
+
+	def __init__(self, *args, **kwargs):
+		pass
+
+	def Bind(self, *args, **kwargs):
+		pass
+
+class Dialog(Window):
+	pass
+
+class ListCtrl(Window):
+	pass
+
+class BoxSizer:
+
+	def __init__(self, *args, **kwargs):
+		pass
@@ -0,0 +1,93 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Replays storms of profile switches, like when quickly cycling through applications with their own profiles, and reports the driver operations saved by coalescing them.
+
+Each storm is replayed twice, once with coalescing disabled and once with the default coalescing delay.
+Each profile uses a voice of a different synth, so that applying the voice of each profile loads a synth.
+
+Usage: python benchmarks/profileSwitchStorm.py [--storms 10] [--interval 20] [--profiles 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import harness
+from harness import Environment
+
+import config
+import synthDriverHandler
+import wx
+
+import globalPlugins.voiceToggle.consts as consts
+
+STORM_SIZES = [2, 5, 10, 20]
+DRIVER_OPERATIONS = ["instantiations", "terminations", "voiceAssignments", "paramAssignments", "saveSettings"]
+
+def replayStorms(environment, stormSize, stormsCount, interval, profilesCount, coalesceDelay):
+	consts.PROFILE_SWITCH_COALESCE_DELAY = coalesceDelay
+	app = environment.createApp(profilesCount)
+	profilesNames = [f"profile{index}" for index in range(profilesCount)]
+	for index, profileName in enumerate(profilesNames):
+		app.profilesVoiceSettingsIds[profileName] = app.getVoiceSettings()[index]["id"]
+	synthDriverHandler.resetStats()
+	start = time.perf_counter()
+	for storm in range(stormsCount):
+		for switch in range(stormSize):
+			config.setActiveProfile(profilesNames[(storm + switch) % profilesCount])
+			app.handleProfileSwitch()
+			wx.runPending(advanceTimers=False)
+			time.sleep(interval / 1000)
+
+		# The storm settles before the next one starts
+		time.sleep(coalesceDelay / 1000)
+		wx.runPending()
+		environment.waitForSynthSwitch(app)
+	duration = time.perf_counter() - start
+	finalIndex = app.currentVoiceSettingsIndex
+	isFinalVoiceApplied = synthDriverHandler.getSynth() != None and synthDriverHandler.getSynth().name == app.getVoiceSettings()[finalIndex]["synthId"]
+	return {
+		"durationMs": duration * 1000,
+		"isFinalVoiceApplied": isFinalVoiceApplied,
+		**{operation: synthDriverHandler.stats[operation] for operation in DRIVER_OPERATIONS},
+	}
+
+def main():
+	parser = argparse.ArgumentParser(description="Replays storms of profile switches using stand-ins for the NVDA modules.")
+	parser.add_argument("--storms", type=int, default=10, help="number of storms of each size")
+	parser.add_argument("--interval", type=float, default=20, help="time between the switches of a storm in milliseconds")
+	parser.add_argument("--profiles", type=int, default=5, help="number of profiles, each with a voice of a different synth")
+	parser.add_argument("--init-delay", type=float, default=0.0, help="instantiation delay of each fake synth in milliseconds")
+	args = parser.parse_args()
+
+	defaultCoalesceDelay = consts.PROFILE_SWITCH_COALESCE_DELAY
+	environment = Environment(args.profiles, initDelay=args.init_delay / 1000)
+	results = []
+	for stormSize in STORM_SIZES:
+		uncoalesced = replayStorms(environment, stormSize, args.storms, args.interval, args.profiles, 0)
+		coalesced = replayStorms(environment, stormSize, args.storms, args.interval, args.profiles, defaultCoalesceDelay)
+		savedOperations = {operation: uncoalesced[operation] - coalesced[operation] for operation in DRIVER_OPERATIONS}
+		results.append({
+			"stormSize": stormSize,
+			"uncoalesced": uncoalesced,
+			"coalesced": coalesced,
+			"savedOperations": savedOperations,
+		})
+		print(f"storm size {stormSize}: saved {savedOperations['instantiations']} of {uncoalesced['instantiations']} synth instantiations, {savedOperations['voiceAssignments']} of {uncoalesced['voiceAssignments']} voice assignments, final voice applied: {coalesced['isFinalVoiceApplied']}", file=sys.stderr)
+	environment.close()
+	consts.PROFILE_SWITCH_COALESCE_DELAY = defaultCoalesceDelay
+	json.dump({
+		"parameters": {
+			"storms": args.storms,
+			"intervalMs": args.interval,
+			"profiles": args.profiles,
+			"coalesceDelayMs": defaultCoalesceDelay,
+		},
+		"results": results,
+	}, sys.stdout, indent="\t")
+	print()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,212 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Benchmarks the VoiceToggle toggle, validation, profile switch and config paths on plain Python.
+
+The NVDA modules are replaced by the stand-ins in the nvdaStubs directory, and synths are fake drivers with configurable instantiation delay and voice counts.
+Results are written as JSON, so that runs of different releases can be compared using the --compare option.
+
+Usage: python benchmarks/runBenchmarks.py [--quick] [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+import harness
+from harness import Environment, measure
+
+import config
+import synthDriverHandler
+import synthSettingsRing
+import wx
+
+import buildVars
+from globalPlugins.voiceToggle import GlobalPlugin
+
+VOICE_SETTINGS_COUNTS = [1, 10, 100, 1000]
+SYNTHS_COUNTS = [1, 10, 50]
+QUICK_VOICE_SETTINGS_COUNTS = [1, 100]
+QUICK_SYNTHS_COUNTS = [1, 10]
+RESULTS_SCHEMA_VERSION = 1
+
+# Deferred work which is due only after a delay, like saving the settings, is not part of the measured calls
+# Synth drivers loaded in the background, if enabled, are not part of the measured calls either, but the previous switch is finished before each call
+
+def benchmarkToggleVoice(environment, app, iterations):
+	def toggle():
+		app.toggleVoice()
+		wx.runPending(advanceTimers=False)
+	return measure(toggle, iterations, setUp=lambda: environment.waitForSynthSwitch(app))
+
+def benchmarkAsyncToggleVoice(environment, app, iterations):
+	# Only the hand-over of the switch to the worker thread is measured, and each switch is verified to have been applied
+	with environment.backgroundLoading(app):
+		result = benchmarkToggleVoice(environment, app, iterations)
+		environment.waitForSynthSwitch(app)
+		voiceSetting = app.getVoiceSettings()[app.currentVoiceSettingsIndex]
+		synth = synthDriverHandler.getSynth()
+		result["isFinalVoiceApplied"] = synth != None and synth.name == voiceSetting["synthId"] and synth.voice == voiceSetting["voiceId"]
+	return result
+
+def benchmarkChangeVoice(environment, app, iterations):
+	indices = iter(range(iterations))
+	def change():
+		app.changeVoice(next(indices) % len(app.getVoiceSettings()), announceChange=False)
+		wx.runPending(advanceTimers=False)
+	return measure(change, iterations, setUp=lambda: environment.waitForSynthSwitch(app))
+
+def benchmarkDeleteInvalidVoiceSettings(environment, app, iterations):
+	# Every tenth voice setting uses a synth which is not installed
+	voiceSettings = environment.createVoiceSettings(len(app.getVoiceSettings()), invalidEvery=10)
+	def setUp():
+		app.applyVoiceSettings(voiceSettings)
+		environment.waitForSynthSwitch(app)
+		wx.runPending()
+	def delete():
+		app.updateSynthsWithVoices()
+		app.deleteInvalidVoiceSettings(startIndex=0, dontChangeVoice=True)
+	return measure(delete, iterations, setUp=setUp)
+
+def benchmarkHandleProfileSwitch(environment, app, iterations):
+	profilesNames = iter([None, "profile1", "profile2"] * iterations)
+	def switch():
+		config.setActiveProfile(next(profilesNames))
+		app.handleProfileSwitch()
+		wx.runPending(advanceTimers=False)
+	return measure(switch, iterations, setUp=lambda: environment.waitForSynthSwitch(app))
+
+def benchmarkRingChangeValue(environment, app, iterations):
+	# Like holding the key increasing the rate in the synth settings ring
+	ring = synthSettingsRing.SynthSettingsRing("rate")
+	methods = iter([ring.increase, ring.decrease] * iterations)
+	def change():
+		next(methods)()
+	return measure(change, iterations)
+
+def benchmarkStartup(environment, app, iterations):
+	# NVDA waits only for the construction of the global plugin, the rest of the add-on is initialized once NVDA has started
+	app.terminate()
+	environment.waitForBackgroundWork(app)
+	environment.app = None
+	plugins = []
+	def tearDownPlugin():
+		if len(plugins) > 0:
+			plugin = plugins.pop()
+			plugin.__terminate__()
+			if plugin._app != None:
+				environment.waitForBackgroundWork(plugin._app)
+		wx.clearPending()
+		environment.removeMonkeyPatches()
+	def createPlugin():
+		plugins.append(GlobalPlugin())
+	def setUpDeferredInitialization():
+		tearDownPlugin()
+		createPlugin()
+	def initialize():
+		plugins[-1].getApp()
+	result = measure(createPlugin, iterations, setUp=tearDownPlugin)
+	deferredResult = measure(initialize, iterations, setUp=setUpDeferredInitialization)
+	tearDownPlugin()
+	result["deferredInitializationMedianMs"] = deferredResult["medianMs"]
+	result["deferredInitializationP95Ms"] = deferredResult["p95Ms"]
+	return result
+
+def benchmarkLoadSettingsFromConfig(environment, app, iterations):
+	return measure(app.loadSettingsFromConfig, iterations)
+
+def benchmarkSaveSettingsToConfig(environment, app, iterations):
+	# Like saving after the rate of the current voice has been changed
+	rates = iter(range(iterations))
+	def setUp():
+		app.updateVoiceSettingParam("rate", next(rates) % 100)
+	return measure(app.saveSettingsTOConfig, iterations, setUp=setUp)
+
+BENCHMARKS = {
+	"toggleVoice": benchmarkToggleVoice,
+	"asyncToggleVoice": benchmarkAsyncToggleVoice,
+	"changeVoice": benchmarkChangeVoice,
+	"deleteInvalidVoiceSettings": benchmarkDeleteInvalidVoiceSettings,
+	"handleProfileSwitch": benchmarkHandleProfileSwitch,
+	"ringChangeValue": benchmarkRingChangeValue,
+	"startup": benchmarkStartup,
+	"loadSettingsFromConfig": benchmarkLoadSettingsFromConfig,
+	"saveSettingsTOConfig": benchmarkSaveSettingsToConfig,
+}
+
+def runBenchmarks(voiceSettingsCounts, synthsCounts, iterations, voicesPerSynth, initDelay, benchmarksNames):
+	results = []
+	for synthsCount in synthsCounts:
+		environment = Environment(synthsCount, voicesPerSynth=voicesPerSynth, initDelay=initDelay)
+		for voiceSettingsCount in voiceSettingsCounts:
+			for benchmarkName in benchmarksNames:
+				app = environment.createApp(voiceSettingsCount)
+				result = {
+					"benchmark": benchmarkName,
+					"voiceSettings": voiceSettingsCount,
+					"synths": synthsCount,
+				}
+				result.update(BENCHMARKS[benchmarkName](environment, app, iterations))
+				results.append(result)
+				print(f"{benchmarkName} voiceSettings={voiceSettingsCount} synths={synthsCount}: median {result['medianMs']:.3f} ms, p95 {result['p95Ms']:.3f} ms", file=sys.stderr)
+		environment.close()
+	return results
+
+def getResultKey(result):
+	return (result["benchmark"], result["voiceSettings"], result["synths"])
+
+def compareResults(previousResults, results):
+	previousByKey = {getResultKey(result): result for result in previousResults}
+	for result in results:
+		previous = previousByKey.get(getResultKey(result))
+		if previous == None or previous["medianMs"] == 0:
+			continue
+		ratio = result["medianMs"] / previous["medianMs"]
+		print(f"{result['benchmark']} voiceSettings={result['voiceSettings']} synths={result['synths']}: median {previous['medianMs']:.3f} -> {result['medianMs']:.3f} ms ({ratio:.2f}x)")
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmarks VoiceToggle using stand-ins for the NVDA modules.")
+	parser.add_argument("--quick", action="store_true", help="run a reduced matrix of voice settings and synths counts")
+	parser.add_argument("--iterations", type=int, default=None, help="number of measured calls of each benchmark")
+	parser.add_argument("--voices-per-synth", type=int, default=20, help="number of voices of each fake synth")
+	parser.add_argument("--init-delay", type=float, default=0.0, help="instantiation delay of each fake synth in milliseconds")
+	parser.add_argument("--benchmark", action="append", choices=list(BENCHMARKS), help="run only the given benchmark, can be repeated")
+	parser.add_argument("--output", help="path of the JSON results file, results are printed to standard output if not given")
+	parser.add_argument("--compare", help="path of a previous JSON results file to compare the medians with")
+	args = parser.parse_args()
+
+	iterations = args.iterations if args.iterations != None else (10 if args.quick else 50)
+	results = runBenchmarks(
+		QUICK_VOICE_SETTINGS_COUNTS if args.quick else VOICE_SETTINGS_COUNTS,
+		QUICK_SYNTHS_COUNTS if args.quick else SYNTHS_COUNTS,
+		iterations,
+		args.voices_per_synth,
+		args.init_delay / 1000,
+		args.benchmark or list(BENCHMARKS),
+	)
+	report = {
+		"schemaVersion": RESULTS_SCHEMA_VERSION,
+		"addonVersion": buildVars.addon_info["addon_version"],
+		"python": platform.python_version(),
+		"timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+		"parameters": {
+			"iterations": iterations,
+			"voicesPerSynth": args.voices_per_synth,
+			"initDelayMs": args.init_delay,
+		},
+		"results": results,
+	}
+	if args.output != None:
+		with open(args.output, "w", encoding="utf-8") as file:
+			json.dump(report, file, indent="\t")
+	else:
+		json.dump(report, sys.stdout, indent="\t")
+		print()
+	if args.compare != None:
+		with open(args.compare, "r", encoding="utf-8") as file:
+			compareResults(json.load(file)["results"], results)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,4 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Stand-in synth drivers which behave well, hang, crash or leak, used to verify reading the voices in a separate process."""
@@ -0,0 +1,24 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+from collections import OrderedDict
+
+VOICES_COUNT = 50
+
+class VoiceInfo:
+
+	def __init__(self, id, displayName, language=None):
+		self.id = id
+		self.displayName = displayName
+		self.language = language
+
+class SynthDriver:
+	name = "good"
+
+	def __init__(self):
+		# Output printed by the driver must not be mixed with the voices written by the worker
+		print("good: initialized")
+		self.availableVoices = OrderedDict((f"voice{index}", VoiceInfo(f"voice{index}", f"Good voice {index}", "en_US")) for index in range(VOICES_COUNT))
+
+	def terminate(self):
+		pass
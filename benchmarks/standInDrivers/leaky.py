@@ -0,0 +1,25 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import threading
+import time
+
+from .good import SynthDriver as GoodSynthDriver
+
+leakedMemory = []
+
+def runForever():
+	while True:
+		time.sleep(1)
+
+class SynthDriver(GoodSynthDriver):
+	name = "leaky"
+
+	def __init__(self):
+		super().__init__()
+		# A thread which is not daemon would keep the process alive, and the memory is never freed
+		threading.Thread(target=runForever).start()
+		leakedMemory.append(bytearray(64 * 1024 * 1024))
+
+	def terminate(self):
+		pass
@@ -0,0 +1,10 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+class SynthDriver:
+	name = "needsNVDA"
+
+	def __init__(self):
+		# Like most NVDA drivers, which read their settings from the configuration of the running NVDA
+		import config
+		config.conf["speech"][self.name]
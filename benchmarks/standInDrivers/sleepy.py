@@ -0,0 +1,11 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+import time
+
+class SynthDriver:
+	name = "sleepy"
+
+	def __init__(self):
+		# Like a driver waiting forever for an audio device or a license server
+		time.sleep(3600)
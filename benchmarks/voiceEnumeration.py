@@ -0,0 +1,79 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Reads the voices of the stand-in synth drivers, which behave well, hang, crash or leak, in a separate process, and verifies that each of them finishes within the timeout and leaves no process behind.
+
+Usage: python benchmarks/voiceEnumeration.py [--timeout 2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import harness
+
+from globalPlugins.voiceToggle.voiceEnumerator import VoiceEnumerator, VoiceEnumerationError
+
+STAND_IN_SYNTHS_IDS = ["good", "sleepy", "crashing", "leaky", "needsNVDA", "missing"]
+
+def getChildProcessesIds():
+	# Only Linux has the /proc file system, elsewhere the check is skipped
+	if not os.path.isdir("/proc"):
+		return None
+	childrenIds = []
+	for entry in os.listdir("/proc"):
+		if not entry.isdigit():
+			continue
+		try:
+			with open(f"/proc/{entry}/stat") as statFile:
+				stat = statFile.read()
+		except OSError:
+			continue
+		# The parent process ID is the second field after the process name, which may contain spaces
+		if int(stat.rsplit(")", 1)[1].split()[1]) == os.getpid():
+			childrenIds.append(int(entry))
+	return childrenIds
+
+def main():
+	parser = argparse.ArgumentParser(description="Reads the voices of the stand-in synth drivers in a separate process.")
+	parser.add_argument("--timeout", type=float, default=2, help="time in seconds after which the process is killed")
+	args = parser.parse_args()
+
+	voiceEnumerator = VoiceEnumerator(driversPackage="standInDrivers", timeout=args.timeout)
+	voiceEnumerator.enable(True)
+	if not voiceEnumerator.isAvailable:
+		print("No Python interpreter is available to run the worker process", file=sys.stderr)
+		sys.exit(1)
+	results = []
+	for synthId in STAND_IN_SYNTHS_IDS:
+		start = time.perf_counter()
+		# Only the drivers which raised an exception would be instantiated in NVDA, the crashed and hung ones are skipped
+		status = "skipped"
+		try:
+			voices = voiceEnumerator.getVoices(synthId)
+			status = "needsNVDA" if voices == None else "read"
+		except VoiceEnumerationError:
+			voices = None
+		duration = time.perf_counter() - start
+		childrenIds = getChildProcessesIds()
+		results.append({
+			"synthId": synthId,
+			"voices": None if voices == None else len(voices),
+			"status": status,
+			"durationS": duration,
+			"isWithinTimeout": duration < args.timeout + 1,
+			"leftProcesses": childrenIds,
+		})
+		print(f"{synthId}: {status}{'' if voices == None else f' {len(voices)} voices'} in {duration:.2f} s, left processes {childrenIds}", file=sys.stderr)
+	json.dump({
+		"parameters": {
+			"timeout": args.timeout,
+		},
+		"results": results,
+	}, sys.stdout, indent="\t")
+	print()
+
+if __name__ == "__main__":
+	main()
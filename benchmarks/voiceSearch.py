@@ -0,0 +1,100 @@
+# Copyright 2025 Adam Samec <adam.samec@gmail.com>
+# This add-on is free software, licensed under the terms of the GNU General Public License (version 2). see <https://www.gnu.org/licenses/gpl-2.0.html>.
+
+"""Benchmarks the voices search index of the add voice dialog, by building it for synths with many voices and replaying queries typed keystroke by keystroke.
+
+Usage: python benchmarks/voiceSearch.py [--voices 10000] [--iterations 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import harness
+from harness import getPercentile
+
+from globalPlugins.voiceToggle.voiceCatalog import Voices
+from globalPlugins.voiceToggle.voiceSearchIndex import VoiceSearchIndex
+
+VOICES_COUNTS = [100, 1000, 10000]
+LANGUAGES = ["en_US", "en_GB", "fr_FR", "de_DE", "cs_CZ", "es_ES", "pt_BR", "zh_CN", "ja_JP", "ar_SA"]
+NAMES = ["Microsoft David", "Microsoft Zira", "eSpeak variant", "Vocalizer Expressive", "Acapela"]
+QUERIES = ["microsoft zira en us", "espeak cs", "vocalizer fr fr 42", "ja"]
+
+def createVoices(count):
+	# Like OneCore and SAPI voice tokens, the IDs are long paths containing the language
+	ids = []
+	names = []
+	languages = []
+	for index in range(count):
+		language = LANGUAGES[(index // len(NAMES)) % len(LANGUAGES)]
+		ids.append(f"HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech_OneCore\\Voices\\Tokens\\voice{index}_{language}")
+		names.append(f"{NAMES[index % len(NAMES)]} {index} - {language.replace('_', ' ')}")
+		languages.append(language)
+	return Voices(ids, names, languages)
+
+def measureMs(func, iterations):
+	durations = []
+	for iteration in range(iterations):
+		start = time.perf_counter()
+		func()
+		durations.append((time.perf_counter() - start) * 1000)
+	durations.sort()
+	return durations
+
+def measureIndexMemory(voices):
+	# Only the memory retained by the index is measured, the voices are shared with the catalog
+	tracemalloc.start()
+	try:
+		before = tracemalloc.take_snapshot()
+		searchIndex = VoiceSearchIndex(voices)
+		after = tracemalloc.take_snapshot()
+	finally:
+		tracemalloc.stop()
+	return searchIndex, sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+def benchmarkVoices(voicesCount, iterations):
+	voices = createVoices(voicesCount)
+	buildDurations = measureMs(lambda: VoiceSearchIndex(voices), max(1, iterations // 10))
+	searchIndex, indexBytes = measureIndexMemory(voices)
+
+	# Each prefix of each query is searched, like when the query is typed into the filter field
+	keystrokesDurations = []
+	for query in QUERIES:
+		for length in range(1, len(query) + 1):
+			keystrokesDurations += measureMs(lambda: searchIndex.search(query[:length]), iterations)
+	keystrokesDurations.sort()
+	return {
+		"voices": voicesCount,
+		"buildMedianMs": getPercentile(buildDurations, 50),
+		"indexBytes": indexBytes,
+		"keystrokeMedianMs": getPercentile(keystrokesDurations, 50),
+		"keystrokeP95Ms": getPercentile(keystrokesDurations, 95),
+		"keystrokeMaxMs": keystrokesDurations[-1],
+		"matches": {query: len(searchIndex.search(query)) for query in QUERIES},
+	}
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmarks the voices search index of the add voice dialog.")
+	parser.add_argument("--voices", type=int, action="append", help="number of voices of the synth, can be repeated")
+	parser.add_argument("--iterations", type=int, default=20, help="number of searches of each typed prefix")
+	args = parser.parse_args()
+
+	results = []
+	for voicesCount in args.voices or VOICES_COUNTS:
+		result = benchmarkVoices(voicesCount, args.iterations)
+		results.append(result)
+		print(f"voices={voicesCount}: index built in {result['buildMedianMs']:.1f} ms using {result['indexBytes'] / 1024 / 1024:.1f} MiB, keystroke median {result['keystrokeMedianMs']:.3f} ms, p95 {result['keystrokeP95Ms']:.3f} ms", file=sys.stderr)
+	json.dump({
+		"parameters": {
+			"iterations": args.iterations,
+			"queries": QUERIES,
+		},
+		"results": results,
+	}, sys.stdout, indent="\t")
+	print()
+
+if __name__ == "__main__":
+	main()